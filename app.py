@@ -1,13 +1,22 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import hashlib
 import time
 import os
+import re
+import shlex
+import atexit
+import threading
 from dotenv import load_dotenv
 import urllib.parse
 from bs4 import BeautifulSoup
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 from datetime import datetime
+from collections import deque
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -30,6 +39,115 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# libxml2-backed parser - much faster than the pure-Python 'html.parser' on large docs pages
+HTML_PARSER = 'lxml'
+
+# Element types collected by UniversalWebScraper.scrape_comprehensive, by tag name
+TAG_BUCKETS = {
+    **{f'h{level}': 'headings' for level in range(1, 7)},
+    **dict.fromkeys(['code', 'pre', 'kbd', 'samp', 'var'], 'code_blocks'),
+    'table': 'tables',
+    **dict.fromkeys(['ul', 'ol', 'dl'], 'lists'),
+    **dict.fromkeys(['section', 'article'], 'sections'),
+    'div': 'divs',
+    'p': 'paragraphs',
+    'blockquote': 'blockquotes',
+    'span': 'spans',
+    'a': 'links'
+}
+
+# Container priority - an element is skipped when an extracted ancestor has a tier <= its own
+COVER_TIERS = {'sections': 1, 'divs': 2, 'paragraphs': 3, 'blockquotes': 4}
+COVER_TIER_NONE = 5
+
+# Div classes worth extracting, and keywords that make a standalone span API-relevant.
+# Matched as case-insensitive substrings with one compiled alternation each
+API_DIV_CLASSES = ['endpoint', 'parameter', 'example', 'code', 'request', 'response', 'method']
+API_SPAN_KEYWORDS = ['string', 'number', 'boolean', 'required', 'optional', 'enum', 
+                     'get', 'post', 'put', 'delete', 'patch', 'application/json',
+                     'bearer', 'token', 'auth', 'api', 'endpoint', 'header']
+API_DIV_CLASS_RE = re.compile('|'.join(map(re.escape, API_DIV_CLASSES)), re.IGNORECASE)
+API_SPAN_KEYWORD_RE = re.compile('|'.join(map(re.escape, API_SPAN_KEYWORDS)), re.IGNORECASE)
+
+# Raw HTML of extracted elements is only kept for debugging - the AI prompt uses their
+# text. str(element) re-walks the whole subtree, which made it the most expensive step
+# of the scrape
+INCLUDE_HTML = os.getenv("SCRAPER_INCLUDE_HTML", "0") == "1"
+
+# Pages whose cURLs are extracted by the LLM at the same time
+AI_EXTRACTION_WORKERS = 8
+
+# Selenium wait polling interval (WebDriverWait's default 0.5s leaves ready pages idle)
+SELENIUM_POLL_SECONDS = 0.1
+
+# Per-page extraction results keyed by SHA-256 of the exact request (model + prompt + page
+# content), so re-scraping an unchanged page never repeats its LLM call. EXTRACTION_CACHE=0 disables
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE", "1") == "1"
+EXTRACTION_CACHE_DIR = ".extraction_cache"
+EXTRACTION_MODEL = "gpt-4o-mini"
+# Routes every extraction request to the same prompt cache - they all start with CURL_EXTRACTION_PROMPT
+EXTRACTION_PROMPT_CACHE_KEY = "curl-extractor-v1"
+
+# Query params that never change page content, and path segments that are record IDs
+# (UUID, Mongo ObjectId, hex hash, ULID, numeric id of 9+ digits) - both ignored when deduplicating
+# URLs. Numeric ids need more digits than a date slug (/changelog/20240101), which is its own page
+TRACKING_PARAM_RE = re.compile(r'utm_|ref$|source$|sessionid$|sid$|fbclid$|gclid$', re.IGNORECASE)
+ID_SEGMENT_RE = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+    r'|[0-9a-f]{24}$|[0-9a-f]{32,}$|[0-9A-HJKMNP-TV-Z]{26}$|\d{9,}$',
+    re.IGNORECASE
+)
+
+# Extraction answers: a ```json fence, else any fence (up to the closing fence or the end),
+# else the outermost [...] in the text
+JSON_FENCE_RE = re.compile(r'```json(.*?)(?:```|$)', re.DOTALL)
+CODE_FENCE_RE = re.compile(r'```(.*?)(?:```|$)', re.DOTALL)
+JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# cURL flags that take a value (skipped when looking for the URL), the subset that sends a
+# body (implies POST), and path segments that are parameter placeholders
+CURL_BODY_FLAGS = {'-d', '--data', '--data-raw', '--data-binary', '--data-urlencode', '-F', '--form', '--json'}
+CURL_VALUE_FLAGS = CURL_BODY_FLAGS | {'-H', '--header', '-X', '--request', '-u', '--user', '-o', '--output',
+                                      '-A', '--user-agent', '-b', '--cookie', '-e', '--referer', '--url'}
+CURL_PATH_PARAM_RE = re.compile(r'<<[^>]*>>|\{+[^}]*\}+|:\w+')
+
+# Pages whose title contains one of these are never sent to the LLM (substring match, one scan)
+NON_API_TITLE_KEYWORDS = ['privacy', 'terms', 'about', 'contact', 'careers', 'blog', 'showcase']
+NON_API_TITLE_RE = re.compile('|'.join(map(re.escape, NON_API_TITLE_KEYWORDS)), re.IGNORECASE)
+
+# Prompt sections after the code blocks, in priority order:
+# (page_data key, section heading, items this long or longer are skipped, item template, section trailer)
+PROMPT_SECTIONS = (
+    ('tables', "## Tables:\n", None, "```\n{text}\n```\n\n", ""),  # parameter info is crucial
+    ('headings', "## Headings:\n", None, "{marks} {text}\n", "\n"),  # structure is important
+    ('lists', "## Lists:\n", 2000, "```\n{text}\n```\n\n", ""),  # parameter lists, endpoint lists
+    ('paragraphs', "## Paragraphs:\n", 800, "{text}\n\n", ""),
+    ('divs', "## Divs:\n", 1000, "{text}\n\n", ""),  # contain parameter info
+    ('spans', "## Spans:\n", None, "{text}\n", "\n"),  # parameter names, types, values
+    ('blockquotes', "## Notes:\n", None, "> {text}\n\n", ""),  # important notes
+    ('sections', "## Sections:\n", 1500, "{text}\n\n", ""),
+)
+
+# Links to files rather than docs pages - never queued for crawling
+BINARY_SUFFIXES = ('.pdf', '.zip', '.tar.gz', '.jpg', '.png', '.gif')
+
+# Retries for the extraction LLM calls - the SDK backs off exponentially with jitter on
+# 429/5xx/connection errors (honouring Retry-After), so a rate limit costs a wait, not a page
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+
+# Pages fetched concurrently per crawl wave (requests path only)
+SCRAPE_WORKERS = 8
+
+# Where the resolved chromedriver path is remembered between runs, so ChromeDriverManager
+# (cache lookup, often a network version check) only runs when the binary is missing
+CHROMEDRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "connectoragent", "chromedriver_path")
+
+# LLM debug artifacts (llm_input_data.jsonl, full AI responses in the log) are opt-in,
+# same AGENT_DEBUG=1 switch as fastn_function
+DEBUG = os.getenv("AGENT_DEBUG") == "1"
+if DEBUG:
+    logger.setLevel(logging.DEBUG)
+
 # Use the ORIGINAL system prompt from app.py - NO changes, NO platform-specific examples
 ORIGINAL_SYSTEM_PROMPT = """
 You are a Connector Creation Assistant for Fastn.ai. Your job is to help users create connectors by following a structured workflow.
@@ -410,6 +528,100 @@ def fastn_function(params):
 Always make sure that every parameter accessed in the code (like `params['auth']['host']`) is properly defined in the `input_schema`.
 """
 
+# Static system prompt for per-page cURL extraction. Kept byte-identical across calls and
+# placed before the page content, so OpenAI's automatic prompt caching reuses the prefix
+CURL_EXTRACTION_PROMPT = """Extract and create cURL commands from API documentation fragments.
+
+You will receive fragmented API documentation with code blocks. Look for:
+- Existing cURL examples (even with auth headers)
+- API endpoint paths like "/v3/contacts", "POST /v3/campaigns" 
+- Base URLs like "https://api.getresponse.com"
+- Path parameters in {braces}
+
+**CRITICAL RULES:**
+1. **EXTRACT FROM FRAGMENTS** - Piece together endpoints from scattered code blocks
+2. **COMPLETE CURLS REQUIRED** - Every cURL must be complete and valid with ALL documented parameters
+3. **INCLUDE ALL PARAMETERS** - Add all query parameters, path parameters, and body fields found in documentation
+4. **USE SINGLE QUOTES** - Always use single quotes in cURL commands
+5. **KEEP ALL HEADERS** - Include ALL headers from documentation (Authorization, Content-Type, Accept, etc.)
+6. **MAP PATH PARAMETERS** - Convert {contactId} to <<url.contactId>>, {campaignId} to <<url.campaignId>>
+7. **STATIC QUERY PARAMS** - Keep ?page=1&limit=100 as-is (do NOT template)
+8. **GET = NO BODY** - GET requests never have -d body data
+9. **COMPLETE URLS** - Always use full https://domain.com/path format
+10. **NO INCOMPLETE CURLS** - Every endpoint must have complete URL, proper headers, and all documented parameters
+
+**EXAMPLE INPUT FRAGMENTS:**
+```
+$ curl -H "Authorization: Bearer token123" https://api.example.com/v1/users
+```
+```
+POST /v1/items
+```
+```
+GET /v1/users/{userId}/items
+```
+
+**EXPECTED OUTPUT:**
+```json
+[
+  {
+    "name": "getUsers", 
+    "curl": "curl -X GET 'https://api.example.com/v1/users' -H 'Authorization: Bearer token123' -H 'Content-Type: application/json'"
+  },
+  {
+    "name": "createItem",
+    "curl": "curl -X POST 'https://api.example.com/v1/items' -H 'Content-Type: application/json' -H 'Accept: application/json' -d '{\"name\": \"item1\", \"type\": \"product\"}'"
+  },
+  {
+    "name": "getUserItems",
+    "curl": "curl -X GET 'https://api.example.com/v1/users/<<url.userId>>/items?page=1&limit=100' -H 'Content-Type: application/json' -H 'Accept: application/json'"
+  }
+]
+```
+
+PARAMETER MAPPING EXAMPLES:
+- {organizationId} → <<url.organizationId>>
+- {spaceId} → <<url.spaceId>>
+- {userId} → <<url.userId>>
+- {teamId} → <<url.teamId>>
+
+QUERY PARAMETER EXAMPLES:
+- ?page=1&limit=50&order=desc (include documented optional params)
+- ?search=query&role=admin&sort=joinedAt
+
+BODY EXAMPLES (CORRECT - Static JSON):
+- -d '{"name": "item1", "type": "product", "category": "electronics"}'
+- -d '{"email": "user@example.com", "firstName": "John", "lastName": "Doe"}'
+
+BODY EXAMPLES (WRONG - Do NOT template):
+- -d '{"name": "<<body.name>>", "type": "<<body.type>>"}' ❌
+- -d '{"email": "<<body.email>>"}' ❌
+
+CORRECT EXAMPLES:
+✅ GET with query params: curl -X GET 'https://api.example.com/items?page=1&limit=100'
+✅ POST with path param: curl -X POST 'https://api.example.com/users/<<url.userId>>/items' -d '{"name": "item1", "type": "product"}'
+✅ DELETE with path param: curl -X DELETE 'https://api.example.com/items/<<url.itemId>>'
+
+WRONG EXAMPLES:
+❌ GET with body: curl -X GET 'https://api.example.com/items' -d '{"page": 1}' 
+❌ Templated query params: curl -X GET 'https://api.example.com/items?page=<<url.page>>'
+❌ Duplicate params: curl -X GET 'https://api.example.com/items?page=1&page=<<url.page>>'
+❌ Missing headers: curl -X GET 'https://api.example.com/items' (should include Content-Type, Accept, etc.)
+
+OUTPUT FORMAT (JSON):
+[
+  {
+    "name": "listOrganizationMembers",
+    "curl": "curl -X GET 'https://api.gitbook.com/v1/orgs/<<url.organizationId>>/members?page=1&limit=50&order=desc' -H 'Content-Type: application/json' -H 'Accept: application/json'"
+  },
+  {
+    "name": "updateOrganizationMember",
+    "curl": "curl -X PATCH 'https://api.gitbook.com/v1/orgs/<<url.organizationId>>/members/<<url.userId>>' -H 'Content-Type: application/json' -H 'Accept: application/json' -d '{\"role\": \"admin\"}'"
+  }
+]
+
+Return [] if no API endpoints found."""
+
 class DataPersistence:
     def __init__(self, platform_name: str):
         self.platform_name = platform_name.lower()
@@ -418,37 +630,147 @@ class DataPersistence:
         os.makedirs(self.data_dir, exist_ok=True)
         logger.info(f"📁 Created data directory: {self.data_dir}")
     
+    def _write_json(self, filepath: str, data):
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    
     def save_raw_data(self, data: Dict, filename: str = "raw_scraped_data.json"):
         filepath = os.path.join(self.data_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._write_json(filepath, data)
         logger.info(f"💾 Saved raw data to: {filepath}")
     
+    def save_page_jsonl(self, page_data: Dict, filename: str = "raw_scraped_pages.jsonl"):
+        """Append one scraped page as it completes, so pages never have to be held in memory"""
+        filepath = os.path.join(self.data_dir, filename)
+        with open(filepath, 'ab') as f:
+            f.write(orjson.dumps(page_data, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+    
+    def iter_pages_jsonl(self, filename: str = "raw_scraped_pages.jsonl"):
+        """Yield (url, page_data) for each page written by save_page_jsonl, one line at a time"""
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            return
+        with open(filepath, 'rb') as f:
+            for line in f:
+                page_data = orjson.loads(line)
+                yield page_data['url'], page_data
+    
     def save_endpoints(self, endpoints: List[Dict], filename: str = "extracted_endpoints.json"):
         filepath = os.path.join(self.data_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(endpoints, f, indent=2, ensure_ascii=False)
+        self._write_json(filepath, endpoints)
         logger.info(f"🔗 Saved extracted endpoints to: {filepath}")
     
-    def save_llm_inputs(self, llm_inputs: List[Dict], filename: str = "llm_input_data.json"):
-        """Save what we feed to the LLM for debugging purposes"""
+    def save_endpoints_jsonl(self, endpoints: List[Dict], filename: str = "extracted_endpoints.jsonl"):
+        """Append endpoints one JSON line each, so progress survives a crash mid-extraction"""
+        filepath = os.path.join(self.data_dir, filename)
+        with open(filepath, 'ab') as f:
+            f.write(b"".join(orjson.dumps(endpoint) + b"\n" for endpoint in endpoints))
+    
+    def save_llm_input_jsonl(self, llm_input: Dict, filename: str = "llm_input_data.jsonl"):
+        """Append what we feed to the LLM for one page (debugging only)"""
         filepath = os.path.join(self.data_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(llm_inputs, f, indent=2, ensure_ascii=False)
-        logger.info(f"🤖 Saved LLM input data to: {filepath}")
+        with open(filepath, 'ab') as f:
+            f.write(orjson.dumps(llm_input) + b"\n")
     
     def save_results(self, results: Dict, filename: str = "final_results.json"):
         filepath = os.path.join(self.data_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        self._write_json(filepath, results)
         logger.info(f"🎯 Saved final results to: {filepath}")
 
+def url_fingerprint(url: str) -> str:
+    """Crawl-dedup key: no fragment or trailing slash, lowercase host, sorted query params minus
+    tracking/session ones, and ID-like path segments collapsed - so variants of a page are crawled once"""
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(
+        (name, value) for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(name)
+    ))
+    path = '/'.join(
+        '{id}' if ID_SEGMENT_RE.match(segment) else segment
+        for segment in parts.path.rstrip('/').split('/')
+    ) or '/'
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+def endpoint_fingerprint(curl: str) -> str:
+    """Dedup key for an extracted cURL: METHOD host/path?sorted-query plus the normalized body.
+    
+    Every path placeholder style (<<url.id>>, {id}, :id) collapses to {param} and templated
+    query values are dropped, but literal query values (?Action=RunInstances) and the body
+    (GraphQL queries, JSON-RPC methods) are kept - they select distinct operations."""
+    try:
+        tokens = shlex.split(curl.replace('\\\n', ' '))
+    except ValueError:
+        return ' '.join(curl.split())
+    
+    method = None
+    url = None
+    bodies = []
+    as_get = False  # -G sends the data as query params
+    index = 1  # tokens[0] is 'curl'
+    while index < len(tokens):
+        token = tokens[index]
+        if token in ('-X', '--request') and index + 1 < len(tokens):
+            method = tokens[index + 1]
+        elif token.startswith('-X') and len(token) > 2:
+            method = token[2:]
+        elif token == '--url' and index + 1 < len(tokens):
+            url = tokens[index + 1]
+        elif token in ('-G', '--get'):
+            as_get = True
+        elif url is None and token.startswith(('http://', 'https://', '<<')):
+            # Only URL-looking tokens - values of flags we don't know (--max-time 10) aren't URLs
+            url = token
+        
+        if token in CURL_BODY_FLAGS and index + 1 < len(tokens):
+            bodies.append(_normalize_curl_body(tokens[index + 1]))
+        if token in CURL_VALUE_FLAGS:
+            index += 1  # skip the flag's value
+        index += 1
+    
+    if url is None:
+        return ' '.join(curl.split())
+    method = (method or ('POST' if bodies and not as_get else 'GET')).upper()
+    parts = urllib.parse.urlsplit(url)
+    path = '/'.join(
+        '{param}' if CURL_PATH_PARAM_RE.fullmatch(segment) else segment
+        for segment in parts.path.rstrip('/').split('/')
+    )
+    query = sorted({
+        name if not value or CURL_PATH_PARAM_RE.fullmatch(value) else f"{name}={value}"
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    })
+    fingerprint = f"{method} {parts.netloc.lower()}{path}?{'&'.join(query)}"
+    return f"{fingerprint} {' '.join(bodies)}" if bodies else fingerprint
+
+def _normalize_curl_body(body: str) -> str:
+    """JSON bodies re-serialized with sorted keys, anything else whitespace-collapsed"""
+    try:
+        return orjson.dumps(orjson.loads(body), option=orjson.OPT_SORT_KEYS).decode()
+    except orjson.JSONDecodeError:
+        return ' '.join(body.split())
+
 class UniversalWebScraper:
+    # chromedriver path and one headless Chrome, reused by every scraper in the process
+    # (installing/starting a driver costs seconds per scraper otherwise)
+    _driver_path = None
+    _shared_driver = None
+    _driver_lock = threading.Lock()
+    
     def __init__(self, data_persistence: DataPersistence, use_selenium=False):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Keep-alive connections shared by the fetch worker threads. Page GETs are safe to
+        # retry, so rate limits and transient 5xx are retried with backoff (honouring Retry-After)
+        adapter = HTTPAdapter(
+            pool_connections=SCRAPE_WORKERS,
+            pool_maxsize=SCRAPE_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.fetch_executor = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS)
         self.data_persistence = data_persistence
         self.use_selenium = use_selenium
         self.driver = None
@@ -459,40 +781,96 @@ class UniversalWebScraper:
         logger.info(f"🌐 UniversalWebScraper initialized (Selenium: {'enabled' if use_selenium else 'disabled'})")
     
     def _init_selenium_driver(self):
-        """Initialize Selenium WebDriver with Chrome"""
+        """Initialize Selenium WebDriver with Chrome (one driver shared by every scraper)"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')  # Run in background
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+            with UniversalWebScraper._driver_lock:
+                if UniversalWebScraper._shared_driver is None:
+                    chrome_options = Options()
+                    chrome_options.add_argument('--headless')  # Run in background
+                    chrome_options.add_argument('--no-sandbox')
+                    chrome_options.add_argument('--disable-dev-shm-usage')
+                    chrome_options.add_argument('--disable-gpu')
+                    chrome_options.add_argument('--window-size=1920,1080')
+                    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+                    # Hand the page back at DOMContentLoaded - the waits below handle dynamic content
+                    chrome_options.page_load_strategy = 'eager'
+                    # Docs pages only need their text - don't download images
+                    chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+                    
+                    # Use ChromeDriverManager to handle driver installation (resolved once per process)
+                    if UniversalWebScraper._driver_path is None:
+                        UniversalWebScraper._driver_path = UniversalWebScraper._resolve_driver_path()
+                    service = Service(UniversalWebScraper._driver_path)
+                    UniversalWebScraper._shared_driver = webdriver.Chrome(service=service, options=chrome_options)
+                    atexit.register(UniversalWebScraper._quit_shared_driver)
+                    logger.info("✅ Selenium WebDriver initialized successfully")
             
-            # Use ChromeDriverManager to handle driver installation
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            logger.info("✅ Selenium WebDriver initialized successfully")
+            self.driver = UniversalWebScraper._shared_driver
             
         except Exception as e:
             logger.error(f"❌ Failed to initialize Selenium WebDriver: {str(e)}")
             self.use_selenium = False
             self.driver = None
     
+    @staticmethod
+    def _resolve_driver_path() -> str:
+        """chromedriver path from the previous run if the binary is still there, else install it"""
+        try:
+            with open(CHROMEDRIVER_PATH_CACHE, 'r', encoding='utf-8') as f:
+                cached_path = f.read().strip()
+            if cached_path and os.path.exists(cached_path):
+                return cached_path
+        except OSError:
+            pass
+        
+        driver_path = ChromeDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(CHROMEDRIVER_PATH_CACHE), exist_ok=True)
+            with open(CHROMEDRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+                f.write(driver_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache chromedriver path: {e}")
+        return driver_path
+    
+    @staticmethod
+    def _quit_shared_driver():
+        """Close the shared Selenium driver at interpreter exit"""
+        driver = UniversalWebScraper._shared_driver
+        UniversalWebScraper._shared_driver = None
+        if driver:
+            try:
+                driver.quit()
+                logger.info("🔒 Selenium WebDriver closed")
+            except:
+                pass
+    
     def _scrape_with_selenium(self, url: str) -> BeautifulSoup:
         """Scrape a single page using Selenium for JavaScript-heavy sites"""
         try:
-            logger.info(f"🤖 Using Selenium to scrape: {url}")
+            logger.info("🤖 Using Selenium to scrape: %s", url)
+            return self._load_with_selenium(url)
+            
+        except TimeoutException:
+            logger.warning(f"⏱️ Selenium timeout for {url} - falling back to requests")
+            return None
+        except WebDriverException as e:
+            logger.error(f"❌ Selenium error for {url}: {str(e)}")
+            return None
+    
+    def _load_with_selenium(self, url: str) -> BeautifulSoup:
+        """Load a page in the shared driver - one page at a time across all scrapers"""
+        with UniversalWebScraper._driver_lock:
             self.driver.get(url)
             
-            # Wait for page to load and JavaScript to execute
-            WebDriverWait(self.driver, 15).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            # Wait for the DOM to be ready. With the 'eager' load strategy get() already
+            # returns at DOMContentLoaded, without waiting on images/iframes/trackers
+            WebDriverWait(self.driver, 15, poll_frequency=SELENIUM_POLL_SECONDS).until(
+                lambda driver: driver.execute_script("return document.readyState") in ("interactive", "complete")
             )
             
             # Additional wait for dynamic content (code blocks, API docs)
             try:
-                WebDriverWait(self.driver, 10).until(
+                WebDriverWait(self.driver, 10, poll_frequency=SELENIUM_POLL_SECONDS).until(
                     EC.any_of(
                         EC.presence_of_element_located((By.TAG_NAME, "pre")),
                         EC.presence_of_element_located((By.TAG_NAME, "code")),
@@ -505,23 +883,18 @@ class UniversalWebScraper:
             
             # Get page source after JavaScript execution
             page_source = self.driver.page_source
-            return BeautifulSoup(page_source, 'html.parser')
-            
-        except TimeoutException:
-            logger.warning(f"⏱️ Selenium timeout for {url} - falling back to requests")
-            return None
-        except WebDriverException as e:
-            logger.error(f"❌ Selenium error for {url}: {str(e)}")
-            return None
+        
+        return BeautifulSoup(page_source, HTML_PARSER)
+    
+    def _fetch_page(self, url: str) -> bytes:
+        """Fetch a page's raw HTML with the pooled session (runs on fetch worker threads)"""
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return response.content
     
     def __del__(self):
-        """Clean up Selenium driver"""
-        if self.driver:
-            try:
-                self.driver.quit()
-                logger.info("🔒 Selenium WebDriver closed")
-            except:
-                pass
+        """Clean up fetch workers (the shared Selenium driver is closed at exit)"""
+        self.fetch_executor.shutdown(wait=False)
     
     def scrape_comprehensive(self, base_url: str, max_pages: int = 10) -> Dict:
         """Universal scraping for any API documentation format"""
@@ -530,238 +903,262 @@ class UniversalWebScraper:
         parsed_url = urllib.parse.urlparse(base_url)
         base_domain = parsed_url.netloc
         
-        urls_to_visit = {base_url}
+        # FIFO crawl queue; pages are deduplicated by URL fingerprint, so '/docs', '/docs/'
+        # and '/docs#auth' are fetched once
+        urls_to_visit = deque([base_url])
+        queued_urls = {url_fingerprint(base_url)}
         visited_urls = set()
-        scraped_pages = {}
+        pages_scraped = 0
         page_count = 0
         
         while urls_to_visit and page_count < max_pages:
-            current_url = urls_to_visit.pop()
+            # Take the next wave of unvisited URLs (at most one per fetch worker)
+            wave = []
+            while urls_to_visit and len(wave) < min(SCRAPE_WORKERS, max_pages - page_count):
+                wave.append(urls_to_visit.popleft())
             
-            if current_url in visited_urls:
-                continue
+            # Fetch the whole wave concurrently - parsing stays on this thread. With Selenium
+            # the single driver loads pages one at a time, so nothing is prefetched
+            prefetched = {}
+            if not (self.use_selenium and self.driver):
+                prefetched = {url: self.fetch_executor.submit(self._fetch_page, url) for url in wave}
             
-            try:
-                page_count += 1
-                logger.info(f"📄 Scraping page {page_count}/{max_pages}: {current_url}")
-                
-                # Try Selenium first if enabled, fall back to requests
-                soup = None
-                if self.use_selenium and self.driver:
-                    soup = self._scrape_with_selenium(current_url)
-                
-                if soup is None:
-                    # Fall back to regular requests
-                    response = self.session.get(current_url, timeout=30)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Remove scripts and styles only
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # COMPREHENSIVE content extraction - capture EVERYTHING
-                page_data = {
-                    'url': current_url,
-                    'title': soup.title.string if soup.title else '',
-                    'headings': [],
-                    'code_blocks': [],
-                    'tables': [],
-                    'lists': [],
-                    'paragraphs': [],
-                    'divs': [],
-                    'spans': [],
-                    'blockquotes': [],
-                    'sections': [],
-                    'articles': [],
-                    'text_content': soup.get_text(),
-                    'links': []
-                }
-                
-                # Extract headings with full context
-                for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                    page_data['headings'].append({
-                        'level': int(heading.name[1]),
-                        'text': heading.get_text().strip(),
-                        'html': str(heading)
-                    })
-                
-                # Extract ALL code-related elements
-                for code in soup.find_all(['code', 'pre', 'kbd', 'samp', 'var']):
-                    code_text = code.get_text().strip()
-                    if code_text and len(code_text) > 2:  # Lower threshold
-                        page_data['code_blocks'].append({
-                            'text': code_text,
-                            'tag': code.name,
-                            'class': code.get('class', []),
-                            'html': str(code)
-                        })
-                
-                # Extract tables (parameter tables are crucial for APIs)
-                for table in soup.find_all('table'):
-                    table_data = {
-                        'text': table.get_text().strip(),
-                        'html': str(table),
-                        'rows': []
+            for current_url in wave:
+                try:
+                    page_count += 1
+                    logger.info("📄 Scraping page %d/%d: %s", page_count, max_pages, current_url)
+                    
+                    # Try Selenium first if enabled, fall back to requests
+                    soup = None
+                    if self.use_selenium and self.driver:
+                        soup = self._scrape_with_selenium(current_url)
+                    
+                    if soup is None:
+                        # Fall back to regular requests (already in flight for this wave)
+                        future = prefetched.get(current_url)
+                        content = future.result() if future else self._fetch_page(current_url)
+                        soup = BeautifulSoup(content, HTML_PARSER)
+                    
+                    # Remove scripts and styles only
+                    for script in soup(["script", "style"]):
+                        script.decompose()
+                    
+                    # COMPREHENSIVE content extraction - capture EVERYTHING
+                    page_data = {
+                        'url': current_url,
+                        'title': soup.title.string if soup.title else '',
+                        'headings': [],
+                        'code_blocks': [],
+                        'tables': [],
+                        'lists': [],
+                        'paragraphs': [],
+                        'divs': [],
+                        'spans': [],
+                        'blockquotes': [],
+                        'sections': [],
+                        'articles': [],
+                        'text_content': soup.get_text(),
+                        'links': []
                     }
-                    for row in table.find_all('tr'):
-                        cells = [cell.get_text().strip() for cell in row.find_all(['td', 'th'])]
-                        if cells:
-                            table_data['rows'].append(cells)
-                    if table_data['rows']:
-                        page_data['tables'].append(table_data)
-                
-                # Extract lists (parameter lists, endpoint lists)
-                for list_elem in soup.find_all(['ul', 'ol', 'dl']):
-                    list_text = list_elem.get_text().strip()
-                    if list_text and len(list_text) > 10:
-                        page_data['lists'].append({
-                            'text': list_text,
-                            'tag': list_elem.name,
-                            'html': str(list_elem)
-                        })
-                
-                # HIERARCHICAL EXTRACTION - Extract from parent containers, skip nested elements
-                # Track extracted elements to avoid duplicates
-                # 
-                # STRATEGY: Process containers in priority order (sections → divs → paragraphs → blockquotes → spans)
-                # - If a container is small enough, extract it and mark ALL children as extracted (prevents duplication)
-                # - If a container is too large, skip it but DON'T mark children as extracted (allows individual processing)
-                # - This ensures useful child elements aren't lost when parent containers are too big
-                extracted_elements = set()
-                
-                # Priority 1: Extract sections and articles FIRST (highest level containers)
-                for section in soup.find_all(['section', 'article']):
-                    section_text = section.get_text().strip()
-                    # SIZE CHECK: Only keep sections under 1500 chars (~300 words)
-                    if section_text and len(section_text) > 50 and len(section_text) < 1500:
-                        page_data['sections'].append({
-                            'text': section_text,
-                            'tag': section.name,
-                            'class': section.get('class', []),
-                            'html': str(section)[:1000]
-                        })
-                        # Mark all child elements as extracted to avoid duplication
-                        for child in section.find_all():
-                            extracted_elements.add(child)
-                    # If section is too large, don't extract the section itself,
-                    # but don't mark children as extracted - let them be processed individually
-                
-                # Priority 2: Extract divs (but skip if already in a section/article)
-                for div in soup.find_all('div'):
-                    if div in extracted_elements:
-                        continue
-                        
-                    div_class = div.get('class', [])
-                    # Focus on API-related div classes
-                    api_classes = ['endpoint', 'parameter', 'example', 'code', 'request', 'response', 'method']
-                    if any(api_term in ' '.join(div_class).lower() for api_term in api_classes) or not div_class:
-                        div_text = div.get_text().strip()
-                        # SIZE CHECK: Only keep divs under 1000 chars (~200 words)
-                        if div_text and len(div_text) > 10 and len(div_text) < 1000:
-                            page_data['divs'].append({
-                                'text': div_text,
-                                'class': div_class,
-                                'html': str(div)[:1000]
-                            })
-                            # Mark all child elements as extracted
-                            for child in div.find_all():
-                                extracted_elements.add(child)
-                        # If div is too large, don't extract the div itself,
-                        # but don't mark children as extracted - let them be processed individually
-                
-                # Priority 3: Extract paragraphs (but skip if already in a div/section)
-                for p in soup.find_all('p'):
-                    if p in extracted_elements:
-                        continue
-                        
-                    p_text = p.get_text().strip()
-                    # SIZE CHECK: Only keep paragraphs under 800 chars (~160 words)
-                    if p_text and len(p_text) > 10 and len(p_text) < 800:
-                        page_data['paragraphs'].append({
-                            'text': p_text,
-                            'class': p.get('class', []),
-                            'html': str(p)
-                        })
-                        # Mark all child elements as extracted to avoid duplication
-                        for child in p.find_all():
-                            extracted_elements.add(child)
-                        # Mark this paragraph as extracted
-                        extracted_elements.add(p)
-                    # If paragraph is too large, don't extract the paragraph itself,
-                    # but don't mark children as extracted - let them be processed individually
-                
-                # Priority 4: Extract blockquotes (but skip if already in a container)
-                for blockquote in soup.find_all('blockquote'):
-                    if blockquote in extracted_elements:
-                        continue
-                        
-                    bq_text = blockquote.get_text().strip()
-                    if bq_text and len(bq_text) < 1200:  # Add size limit for consistency
-                        page_data['blockquotes'].append({
-                            'text': bq_text,
-                            'html': str(blockquote)
-                        })
-                        # Mark all child elements as extracted to avoid duplication
-                        for child in blockquote.find_all():
-                            extracted_elements.add(child)
-                        extracted_elements.add(blockquote)
-                    # If blockquote is too large, don't extract it,
-                    # but don't mark children as extracted - let them be processed individually
-                
-                # Priority 5: Extract ONLY standalone spans with specific API content
-                # Skip spans that are already inside extracted containers
-                for span in soup.find_all('span'):
-                    if span in extracted_elements:
-                        continue
+                    
+                    # SINGLE PASS over the DOM - every element is visited once, in document order,
+                    # and dispatched by tag name (instead of one find_all sweep per element type)
+                    #
+                    # HIERARCHICAL EXTRACTION - Extract from parent containers, skip nested elements
+                    # STRATEGY: Containers have a priority tier (sections → divs → paragraphs → blockquotes → spans)
+                    # - If a container is small enough, extract it and its children inherit its tier
+                    # - If a container is too large, skip it and pass down only what it inherited
+                    #   (allows its children to be processed individually)
+                    # - An element is skipped if an extracted ancestor has the same or higher priority tier
+                    # - This ensures useful child elements aren't lost when parent containers are too big
+                    #
+                    # The walk uses an explicit stack of (element, best tier of an extracted ancestor),
+                    # so coverage is inherited on the way down instead of marking every descendant
+                    seen = {'paragraphs': set(), 'blockquotes': set(), 'spans': set()}  # identical repeats
+                    stack = [(soup, COVER_TIER_NONE)]
+                    
+                    while stack:
+                        element, covered = stack.pop()
+                        child_covered = covered
+                        bucket = TAG_BUCKETS.get(element.name)
+                    
+                        # Extract headings with full context
+                        if bucket == 'headings':
+                            heading_data = {
+                                'level': int(element.name[1]),
+                                'text': element.get_text().strip()
+                            }
+                            if INCLUDE_HTML:
+                                heading_data['html'] = str(element)
+                            page_data['headings'].append(heading_data)
+                    
+                        # Extract ALL code-related elements
+                        elif bucket == 'code_blocks':
+                            code_text = element.get_text().strip()
+                            if code_text and len(code_text) > 2:  # Lower threshold
+                                code_data = {
+                                    'text': code_text,
+                                    'tag': element.name,
+                                    'class': element.get('class', [])
+                                }
+                                if INCLUDE_HTML:
+                                    code_data['html'] = str(element)
+                                page_data['code_blocks'].append(code_data)
+                    
+                        # Extract tables (parameter tables are crucial for APIs)
+                        elif bucket == 'tables':
+                            table_data = {
+                                'text': element.get_text().strip(),
+                                'rows': []
+                            }
+                            if INCLUDE_HTML:
+                                table_data['html'] = str(element)
+                            for row in element.find_all('tr'):
+                                cells = [cell.get_text().strip() for cell in row.find_all(['td', 'th'])]
+                                if cells:
+                                    table_data['rows'].append(cells)
+                            if table_data['rows']:
+                                page_data['tables'].append(table_data)
+                    
+                        # Extract lists (parameter lists, endpoint lists)
+                        elif bucket == 'lists':
+                            list_text = element.get_text().strip()
+                            if list_text and len(list_text) > 10:
+                                list_data = {
+                                    'text': list_text,
+                                    'tag': element.name
+                                }
+                                if INCLUDE_HTML:
+                                    list_data['html'] = str(element)
+                                page_data['lists'].append(list_data)
+                    
+                        # Priority 1: Sections and articles (highest level containers, never skipped)
+                        elif bucket == 'sections':
+                            section_text = element.get_text().strip()
+                            # SIZE CHECK: Only keep sections under 1500 chars (~300 words)
+                            if section_text and len(section_text) > 50 and len(section_text) < 1500:
+                                section_data = {
+                                    'text': section_text,
+                                    'tag': element.name,
+                                    'class': element.get('class', [])
+                                }
+                                if INCLUDE_HTML:
+                                    section_data['html'] = str(element)[:1000]
+                                page_data['sections'].append(section_data)
+                                child_covered = min(covered, COVER_TIERS['sections'])
+                    
+                        # Priority 2: Divs (but skip if already in an extracted section/article/div)
+                        elif bucket == 'divs' and covered > COVER_TIERS['divs']:
+                            div_class = element.get('class', [])
+                            # Focus on API-related div classes
+                            if not div_class or API_DIV_CLASS_RE.search(' '.join(div_class)):
+                                div_text = element.get_text().strip()
+                                # SIZE CHECK: Only keep divs under 1000 chars (~200 words)
+                                if div_text and len(div_text) > 10 and len(div_text) < 1000:
+                                    div_data = {
+                                        'text': div_text,
+                                        'class': div_class
+                                    }
+                                    if INCLUDE_HTML:
+                                        div_data['html'] = str(element)[:1000]
+                                    page_data['divs'].append(div_data)
+                                    child_covered = COVER_TIERS['divs']
+                    
+                        # Priority 3: Paragraphs (but skip if already in a div/section)
+                        elif bucket == 'paragraphs' and covered > COVER_TIERS['paragraphs']:
+                            p_text = element.get_text().strip()
+                            # SIZE CHECK: Only keep paragraphs under 800 chars (~160 words)
+                            if p_text and len(p_text) > 10 and len(p_text) < 800:
+                                # Repeats are recognised by their markup when it is kept, otherwise by their text
+                                p_key = str(element) if INCLUDE_HTML else p_text
+                                if p_key not in seen['paragraphs']:
+                                    seen['paragraphs'].add(p_key)
+                                    p_data = {
+                                        'text': p_text,
+                                        'class': element.get('class', [])
+                                    }
+                                    if INCLUDE_HTML:
+                                        p_data['html'] = p_key
+                                    page_data['paragraphs'].append(p_data)
+                                    child_covered = COVER_TIERS['paragraphs']
+                    
+                        # Priority 4: Blockquotes (but skip if already in a container)
+                        elif bucket == 'blockquotes' and covered > COVER_TIERS['blockquotes']:
+                            bq_text = element.get_text().strip()
+                            if bq_text and len(bq_text) < 1200:  # Add size limit for consistency
+                                bq_key = str(element) if INCLUDE_HTML else bq_text
+                                if bq_key not in seen['blockquotes']:
+                                    seen['blockquotes'].add(bq_key)
+                                    bq_data = {'text': bq_text}
+                                    if INCLUDE_HTML:
+                                        bq_data['html'] = bq_key
+                                    page_data['blockquotes'].append(bq_data)
+                                    child_covered = COVER_TIERS['blockquotes']
+                    
+                        # Priority 5: ONLY standalone spans with specific API content
+                        # Skip spans that are already inside extracted containers
+                        elif bucket == 'spans' and covered > COVER_TIERS['blockquotes']:
+                            span_text = element.get_text().strip()
+                            # Only extract spans with very specific API-relevant content
+                            if (span_text and len(span_text) > 2 and len(span_text) < 50 and
+                                API_SPAN_KEYWORD_RE.search(span_text)):
+                                span_key = str(element) if INCLUDE_HTML else span_text
+                                if span_key not in seen['spans']:
+                                    seen['spans'].add(span_key)
+                                    span_data = {
+                                        'text': span_text,
+                                        'class': element.get('class', [])
+                                    }
+                                    if INCLUDE_HTML:
+                                        span_data['html'] = span_key
+                                    page_data['spans'].append(span_data)
+                    
+                        # Add internal links for crawling
+                        elif bucket == 'links' and element.has_attr('href'):
+                            full_url = urllib.parse.urljoin(current_url, element['href'])
+                            link_netloc = urllib.parse.urlparse(full_url).netloc
+                            link_key = url_fingerprint(full_url)
                         
-                    span_text = span.get_text().strip()
-                    # Only extract spans with very specific API-relevant content
-                    api_span_keywords = ['string', 'number', 'boolean', 'required', 'optional', 'enum', 
-                                        'get', 'post', 'put', 'delete', 'patch', 'application/json',
-                                        'bearer', 'token', 'auth', 'api', 'endpoint', 'header']
+                            if (link_netloc == base_domain and 
+                                link_key not in visited_urls and 
+                                not full_url.endswith(BINARY_SUFFIXES)):
+                                if link_key not in queued_urls:
+                                    queued_urls.add(link_key)
+                                    urls_to_visit.append(full_url)
+                                page_data['links'].append(full_url)
                     
-                    if (span_text and len(span_text) > 2 and len(span_text) < 50 and
-                        any(keyword in span_text.lower() for keyword in api_span_keywords)):
-                        page_data['spans'].append({
-                            'text': span_text,
-                            'class': span.get('class', []),
-                            'html': str(span)
-                        })
-                        extracted_elements.add(span)
-                
-                # Add internal links for crawling
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    full_url = urllib.parse.urljoin(current_url, href)
-                    parsed_url = urllib.parse.urlparse(full_url)
+                        # Children go on in reverse so they come off the stack in document order
+                        stack.extend(
+                            (child, child_covered) for child in reversed(element.contents) if child.name is not None
+                        )
                     
-                    if (parsed_url.netloc == base_domain and 
-                        full_url not in visited_urls and 
-                        not full_url.endswith(('.pdf', '.zip', '.tar.gz', '.jpg', '.png', '.gif'))):
-                        urls_to_visit.add(full_url)
-                        page_data['links'].append(full_url)
-                
-                scraped_pages[current_url] = page_data
-                visited_urls.add(current_url)
-                
-                logger.info(f"✅ Scraped: {page_data['title'][:30]}... ({len(page_data['code_blocks'])} code blocks)")
-                
-                time.sleep(0.3)
-                
-            except Exception as e:
-                logger.error(f"❌ Error scraping {current_url}: {str(e)}")
-                continue
+                    # Free the parse tree now rather than whenever the next page replaces it
+                    soup.decompose()
+                    
+                    # Written out now and dropped - extraction reads the pages back from disk
+                    self.data_persistence.save_page_jsonl(page_data)
+                    pages_scraped += 1
+                    visited_urls.add(url_fingerprint(current_url))
+                    
+                    logger.info("✅ Scraped: %.30s... (%d code blocks)", page_data['title'], len(page_data['code_blocks']))
+                    
+                except Exception as e:
+                    logger.error(f"❌ Error scraping {current_url}: {str(e)}")
+                    continue
+            
+            if wave:
+                time.sleep(0.3)  # Be polite between waves
         
+        # Pages are on disk (raw_scraped_pages.jsonl) - the summary just points at them
         raw_data = {
             'base_url': base_url,
             'scrape_timestamp': datetime.now().isoformat(),
-            'total_pages_scraped': len(scraped_pages),
-            'pages': scraped_pages
+            'total_pages_scraped': pages_scraped,
+            'pages_file': 'raw_scraped_pages.jsonl'
         }
         
         self.data_persistence.save_raw_data(raw_data)
-        logger.info(f"✅ Universal scraping completed: {len(scraped_pages)} pages")
+        logger.info(f"✅ Universal scraping completed: {pages_scraped} pages")
         
         return raw_data
     
@@ -769,353 +1166,289 @@ class UniversalWebScraper:
         """AI-powered endpoint extraction - page by page processing with gpt-5-mini"""
         logger.info("🤖 Using AI to extract endpoints from raw page data...")
         
+        client = client.with_options(max_retries=OPENAI_MAX_RETRIES)
+        if EXTRACTION_CACHE_ENABLED:
+            os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
         all_endpoints = []
-        llm_inputs = []  # Track what we feed to LLM
+        seen_endpoints = set()  # endpoint_fingerprint of every cURL kept so far
+        llm_input_count = 0  # Pages whose LLM input was written out (debug only)
         
-        for url, page_data in raw_data['pages'].items():
-            logger.info(f"🔍 AI processing page: {page_data.get('title', url)[:50]}...")
-            
-            # Filter and optimize page content for LLM
-            filtered_content = self._filter_page_content_for_ai(page_data)
-            
-            if not filtered_content.strip():
-                logger.info("⏭️ Skipping page - no relevant content")
-                continue
+        def extract_page(filtered_content, url):
+            page_start = time.perf_counter()
+            page_curls = self._extract_curls_from_page_with_ai(filtered_content, url, client)
+            return page_curls, time.perf_counter() - page_start
+        
+        def collect(page_label, content_length, future):
+            page_curls, page_seconds = future.result()
             
-            # Save what we're feeding to LLM for debugging
-            llm_input = {
-                'url': url,
-                'title': page_data.get('title', ''),
-                'filtered_content': filtered_content,
-                'content_length': len(filtered_content),
-                'timestamp': datetime.now().isoformat()
-            }
-            llm_inputs.append(llm_input)
+            # Add cURLs not already extracted from an earlier page
+            page_endpoints = self._new_endpoints(page_curls, seen_endpoints)
+            all_endpoints.extend(page_endpoints)
+            if page_endpoints:
+                self.data_persistence.save_endpoints_jsonl(page_endpoints)
             
-            # Extract cURLs from this page using AI
-            page_curls = self._extract_curls_from_page_with_ai(filtered_content, url, client)
+            # One record per page rather than one line per step / per cURL
+            logger.info(
+                "🔍 AI processed page %s: %d cURLs from %d chars in %.2fs%s",
+                page_label, len(page_endpoints), content_length, page_seconds,
+                f" ({', '.join(str(item.get('name')) for item in page_endpoints)})" if page_endpoints else ""
+            )
+        
+        # Pages are read back one at a time from the scrape's JSONL and their LLM calls run
+        # concurrently. At most two pages per worker are in flight, so memory stays bounded
+        # however large the crawl; results are still collected in page order
+        with ThreadPoolExecutor(max_workers=AI_EXTRACTION_WORKERS) as executor:
+            pending = deque()
+            for url, page_data in self.data_persistence.iter_pages_jsonl(raw_data['pages_file']):
+                page_label = page_data.get('title', url)[:50]
+                
+                # Filter and optimize page content for LLM
+                filtered_content = self._filter_page_content_for_ai(page_data)
+                
+                if not filtered_content.strip():
+                    logger.info("⏭️ Skipping page %s - no relevant content", page_label)
+                    continue
+                
+                # Save what we're feeding to LLM for debugging (streamed, not held for the whole run)
+                if DEBUG:
+                    self.data_persistence.save_llm_input_jsonl({
+                        'url': url,
+                        'title': page_data.get('title', ''),
+                        'filtered_content': filtered_content,
+                        'content_length': len(filtered_content),
+                        'timestamp': datetime.now().isoformat()
+                    })
+                    llm_input_count += 1
+                
+                # Extract cURLs from this page using AI
+                future = executor.submit(extract_page, filtered_content, url)
+                pending.append((page_label, len(filtered_content), future))
+                if len(pending) >= 2 * AI_EXTRACTION_WORKERS:
+                    collect(*pending.popleft())
             
-            # Add all cURLs (no deduplication needed - let main AI handle)
-            for curl_item in page_curls:
-                if curl_item and curl_item.get('curl'):
-                    all_endpoints.append(curl_item)
-                    logger.info(f"✅ AI extracted cURL: {curl_item['name']}")
+            while pending:
+                collect(*pending.popleft())
         
-        # Save both endpoints and LLM inputs for debugging
         self.data_persistence.save_endpoints(all_endpoints)
-        self.data_persistence.save_llm_inputs(llm_inputs)
+        if DEBUG:
+            logger.info(f"🤖 LLM input data saved: {llm_input_count} pages processed")
         
         logger.info(f"🎯 AI extraction completed: {len(all_endpoints)} endpoints found")
-        logger.info(f"🤖 LLM input data saved: {len(llm_inputs)} pages processed")
         
         return all_endpoints
     
+    @staticmethod
+    def _new_endpoints(page_curls: List[Dict], seen_endpoints: set) -> List[Dict]:
+        """cURLs whose endpoint_fingerprint hasn't been seen yet (first occurrence wins)"""
+        new_endpoints = []
+        for curl_item in page_curls:
+            if not curl_item or not curl_item.get('curl'):
+                continue
+            fingerprint = endpoint_fingerprint(curl_item['curl'])
+            if fingerprint not in seen_endpoints:
+                seen_endpoints.add(fingerprint)
+                new_endpoints.append(curl_item)
+        return new_endpoints
+    
     def _filter_page_content_for_ai(self, page_data: Dict) -> str:
         """Feed EVERYTHING small to AI, only skip large content blocks"""
         title = page_data.get('title', '')
         
         # Skip obvious non-API pages
-        skip_keywords = ['privacy', 'terms', 'about', 'contact', 'careers', 'blog', 'showcase']
-        if any(keyword in title.lower() for keyword in skip_keywords):
+        if NON_API_TITLE_RE.search(title):
             return ""
         
-        # Build COMPREHENSIVE content - feed everything small, skip only large blocks
-        filtered_content = f"# {title}\n\n"
-        total_size = len(filtered_content)
+        # Build COMPREHENSIVE content - feed everything small, skip only large blocks.
+        # Pieces are collected in one list and joined once at the end
+        parts = [f"# {title}\n\n"]
+        total_size = len(parts[0])
         max_size = 40000  # Increased size limit to ensure all parameter info is included
         
         # Priority 1: ALL Code blocks (NEVER skip - highest priority)
-        code_blocks = page_data.get('code_blocks', [])
-        if code_blocks:
-            section = "## Code Examples:\n"
-            for code_item in code_blocks:
-                if isinstance(code_item, dict):
-                    code_text = code_item.get('text', '')
-                    code_tag = code_item.get('tag', 'code')
-                else:
-                    code_text = str(code_item)
-                    code_tag = 'code'
-                
-                # NEVER skip any code blocks, even single words
-                if code_text.strip():
-                    addition = f"```{code_tag}\n{code_text}\n```\n\n"
-                    section += addition
-                    total_size += len(addition)
+        code_parts = []
+        for code_item in page_data.get('code_blocks', []):
+            if isinstance(code_item, dict):
+                code_text = code_item.get('text', '')
+                code_tag = code_item.get('tag', 'code')
+            else:
+                code_text = str(code_item)
+                code_tag = 'code'
             
-            if len(section) > 20:
-                filtered_content += section
+            # NEVER skip any code blocks, even single words
+            if code_text.strip():
+                addition = f"```{code_tag}\n{code_text}\n```\n\n"
+                code_parts.append(addition)
+                total_size += len(addition)
         
-        # Priority 2: ALL Tables (parameter info is crucial)
-        tables = page_data.get('tables', [])
-        if tables and total_size < max_size:
-            section = "## Tables:\n"
-            for table in tables:
-                table_text = table.get('text', '')
-                if table_text.strip():
-                    addition = f"```\n{table_text}\n```\n\n"
-                    if total_size + len(addition) < max_size:
-                        section += addition
-                        total_size += len(addition)
-            
-            if len(section) > 15:
-                filtered_content += section
+        if code_parts:
+            parts.append("## Code Examples:\n")
+            parts.extend(code_parts)
         
-        # Priority 3: ALL Headings (structure is important)
-        headings = page_data.get('headings', [])
-        if headings and total_size < max_size:
-            section = "## Headings:\n"
-            for heading in headings:
-                text = heading.get('text', '').strip()
-                if text:
-                    level = heading.get('level', 1)
-                    addition = f"{'#' * level} {text}\n"
-                    if total_size + len(addition) < max_size:
-                        section += addition
-                        total_size += len(addition)
+        # Priorities 2-9: everything else that still fits, in PROMPT_SECTIONS order
+        for key, heading, max_item_length, template, trailer in PROMPT_SECTIONS:
+            items = page_data.get(key, [])
+            if not items or total_size >= max_size:
+                continue
             
-            if len(section) > 15:
-                filtered_content += section + "\n"
-        
-        # Priority 4: ALL Lists (parameter lists, endpoint lists)
-        lists = page_data.get('lists', [])
-        if lists and total_size < max_size:
-            section = "## Lists:\n"
-            for list_item in lists:
-                list_text = list_item.get('text', '').strip()
-                if list_text:
-                    # Only skip if extremely long (over 2000 chars)
-                    if len(list_text) < 2000:
-                        addition = f"```\n{list_text}\n```\n\n"
-                        if total_size + len(addition) < max_size:
-                            section += addition
-                            total_size += len(addition)
+            section_parts = []
+            for item in items:
+                text = item.get('text', '')  # stored already stripped by scrape_comprehensive
+                # Only skip empty and very large items
+                if not text or (max_item_length and len(text) >= max_item_length):
+                    continue
+                addition = template.format(text=text, marks='#' * item.get('level', 1))
+                if total_size + len(addition) < max_size:
+                    section_parts.append(addition)
+                    total_size += len(addition)
             
-            if len(section) > 15:
-                filtered_content += section
+            if section_parts:
+                parts.append(heading)
+                parts.extend(section_parts)
+                parts.append(trailer)
         
-        # Priority 5: ALL Small Paragraphs (skip only huge ones)
-        paragraphs = page_data.get('paragraphs', [])
-        if paragraphs and total_size < max_size:
-            section = "## Paragraphs:\n"
-            for para in paragraphs:
-                para_text = para.get('text', '').strip()
-                if para_text:
-                    # Only skip very large paragraphs (over 800 chars)
-                    if len(para_text) < 800:
-                        addition = f"{para_text}\n\n"
-                        if total_size + len(addition) < max_size:
-                            section += addition
-                            total_size += len(addition)
-            
-            if len(section) > 15:
-                filtered_content += section
+        # Add final size info
+        parts.append(f"\n<!-- Content Size: {total_size} characters -->\n")
         
-        # Priority 6: ALL Divs (contain parameter info)
-        divs = page_data.get('divs', [])
-        if divs and total_size < max_size:
-            section = "## Divs:\n"
-            for div in divs:
-                div_text = div.get('text', '').strip()
-                if div_text:
-                    # Only skip very large divs (over 1000 chars)
-                    if len(div_text) < 1000:
-                        addition = f"{div_text}\n\n"
-                        if total_size + len(addition) < max_size:
-                            section += addition
-                            total_size += len(addition)
-            
-            if len(section) > 15:
-                filtered_content += section
+        return ''.join(parts) if total_size > 100 else ""
+    
+    @staticmethod
+    def _extraction_cache_path(messages: List[Dict]) -> str:
+        """Cache file for one page's extraction - SHA-256 of the model and exact messages"""
+        key = hashlib.sha256(orjson.dumps([EXTRACTION_MODEL, messages])).hexdigest()
+        return os.path.join(EXTRACTION_CACHE_DIR, f"{key}.json")
+    
+    @staticmethod
+    def _load_cached_curls(cache_path: str) -> Optional[List[Dict]]:
+        """A page's cached {name, curl} list, or None on a miss (missing, truncated or malformed file)"""
+        try:
+            with open(cache_path, 'rb') as f:
+                curl_data = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if not isinstance(curl_data, list) or not all(isinstance(item, dict) for item in curl_data):
+            return None
+        return curl_data
+    
+    @staticmethod
+    def _store_cached_curls(cache_path: str, curl_data: List[Dict]):
+        # Write-then-rename so a crash never leaves a half-written file; the temp name is per
+        # thread since two workers can extract identical pages at once
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(curl_data))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write extraction cache {cache_path}: {e}")
+    
+    def _curl_extraction_messages(self, page_content: str) -> List[Dict]:
+        """Static extraction prompt first, then the page - the shared prefix is prompt-cacheable"""
+        return [
+            {"role": "system", "content": CURL_EXTRACTION_PROMPT},
+            {"role": "user", "content": f"Extract cURL commands from this page:\n\n{page_content}"}
+        ]
+    
+    def _parse_curl_response(self, result_text: str, page_url: str) -> Optional[List[Dict]]:
+        """Parse the model's JSON list of {name, curl} and tag each item with its page (None if unparseable)"""
+        # DEBUG: Log AI response (formatted only when debug logging is on)
+        logger.debug("🤖 AI response for %s: %.200s...", page_url, result_text)
         
-        # Priority 7: ALL Spans (parameter names, types, values)
-        spans = page_data.get('spans', [])
-        if spans and total_size < max_size:
-            section = "## Spans:\n"
-            for span in spans:
-                span_text = span.get('text', '').strip()
-                if span_text:
-                    # Feed ALL spans - they contain crucial parameter info
-                    addition = f"{span_text}\n"
-                    if total_size + len(addition) < max_size:
-                        section += addition
-                        total_size += len(addition)
+        # Parse JSON response from AI
+        try:
+            fence = JSON_FENCE_RE.search(result_text) or CODE_FENCE_RE.search(result_text)
+            if fence:
+                result_text = fence.group(1).strip()
             
-            if len(section) > 15:
-                filtered_content += section + "\n"
-        
-        # Priority 8: ALL Blockquotes (important notes)
-        blockquotes = page_data.get('blockquotes', [])
-        if blockquotes and total_size < max_size:
-            section = "## Notes:\n"
-            for bq in blockquotes:
-                bq_text = bq.get('text', '').strip()
-                if bq_text:
-                    addition = f"> {bq_text}\n\n"
-                    if total_size + len(addition) < max_size:
-                        section += addition
-                        total_size += len(addition)
+            try:
+                curl_data = orjson.loads(result_text)
+            except orjson.JSONDecodeError:
+                # Unfenced answer with prose around the array
+                array = JSON_ARRAY_RE.search(result_text)
+                if not array:
+                    raise
+                curl_data = orjson.loads(array.group(0))
             
-            if len(section) > 15:
-                filtered_content += section
-        
-        # Priority 9: ALL Sections/Articles
-        sections = page_data.get('sections', [])
-        if sections and total_size < max_size:
-            section = "## Sections:\n"
-            for sect in sections:
-                sect_text = sect.get('text', '').strip()
-                if sect_text:
-                    # Only skip very large sections
-                    if len(sect_text) < 1500:
-                        addition = f"{sect_text}\n\n"
-                        if total_size + len(addition) < max_size:
-                            section += addition
-                            total_size += len(addition)
+            # Add source page to each item
+            for item in curl_data:
+                item['source_page'] = page_url
             
-            if len(section) > 15:
-                filtered_content += section
-        
-        # Add final size info
-        filtered_content += f"\n<!-- Content Size: {total_size} characters -->\n"
-        
-        return filtered_content if total_size > 100 else ""
+            return curl_data
+            
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"⚠️ AI returned invalid JSON for {page_url}: {e}")
+            logger.debug("Raw response: %s", result_text)
+            return None
     
     def _extract_curls_from_page_with_ai(self, page_content: str, page_url: str, client) -> List[Dict]:
         """Use gpt-5-mini to extract cURL commands + names from raw page data"""
         try:
+            messages = self._curl_extraction_messages(page_content)
+            
+            cache_path = None
+            if EXTRACTION_CACHE_ENABLED:
+                cache_path = self._extraction_cache_path(messages)
+                curl_data = self._load_cached_curls(cache_path)
+                if curl_data is not None:
+                    logger.debug("🗃️ Extraction cache HIT for %s", page_url)
+                    for item in curl_data:
+                        item['source_page'] = page_url
+                    return curl_data
+                logger.debug("🗃️ Extraction cache MISS for %s", page_url)
+            
             response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": """Extract and create cURL commands from API documentation fragments.
-
-You will receive fragmented API documentation with code blocks. Look for:
-- Existing cURL examples (even with auth headers)
-- API endpoint paths like "/v3/contacts", "POST /v3/campaigns" 
-- Base URLs like "https://api.getresponse.com"
-- Path parameters in {braces}
-
-**CRITICAL RULES:**
-1. **EXTRACT FROM FRAGMENTS** - Piece together endpoints from scattered code blocks
-2. **COMPLETE CURLS REQUIRED** - Every cURL must be complete and valid with ALL documented parameters
-3. **INCLUDE ALL PARAMETERS** - Add all query parameters, path parameters, and body fields found in documentation
-4. **USE SINGLE QUOTES** - Always use single quotes in cURL commands
-5. **KEEP ALL HEADERS** - Include ALL headers from documentation (Authorization, Content-Type, Accept, etc.)
-6. **MAP PATH PARAMETERS** - Convert {contactId} to <<url.contactId>>, {campaignId} to <<url.campaignId>>
-7. **STATIC QUERY PARAMS** - Keep ?page=1&limit=100 as-is (do NOT template)
-8. **GET = NO BODY** - GET requests never have -d body data
-9. **COMPLETE URLS** - Always use full https://domain.com/path format
-10. **NO INCOMPLETE CURLS** - Every endpoint must have complete URL, proper headers, and all documented parameters
-
-**EXAMPLE INPUT FRAGMENTS:**
-```
-$ curl -H "Authorization: Bearer token123" https://api.example.com/v1/users
-```
-```
-POST /v1/items
-```
-```
-GET /v1/users/{userId}/items
-```
-
-**EXPECTED OUTPUT:**
-```json
-[
-  {
-    "name": "getUsers", 
-    "curl": "curl -X GET 'https://api.example.com/v1/users' -H 'Authorization: Bearer token123' -H 'Content-Type: application/json'"
-  },
-  {
-    "name": "createItem",
-    "curl": "curl -X POST 'https://api.example.com/v1/items' -H 'Content-Type: application/json' -H 'Accept: application/json' -d '{\"name\": \"item1\", \"type\": \"product\"}'"
-  },
-  {
-    "name": "getUserItems",
-    "curl": "curl -X GET 'https://api.example.com/v1/users/<<url.userId>>/items?page=1&limit=100' -H 'Content-Type: application/json' -H 'Accept: application/json'"
-  }
-]
-```
-
-PARAMETER MAPPING EXAMPLES:
-- {organizationId} → <<url.organizationId>>
-- {spaceId} → <<url.spaceId>>
-- {userId} → <<url.userId>>
-- {teamId} → <<url.teamId>>
-
-QUERY PARAMETER EXAMPLES:
-- ?page=1&limit=50&order=desc (include documented optional params)
-- ?search=query&role=admin&sort=joinedAt
-
-BODY EXAMPLES (CORRECT - Static JSON):
-- -d '{"name": "item1", "type": "product", "category": "electronics"}'
-- -d '{"email": "user@example.com", "firstName": "John", "lastName": "Doe"}'
-
-BODY EXAMPLES (WRONG - Do NOT template):
-- -d '{"name": "<<body.name>>", "type": "<<body.type>>"}' ❌
-- -d '{"email": "<<body.email>>"}' ❌
-
-CORRECT EXAMPLES:
-✅ GET with query params: curl -X GET 'https://api.example.com/items?page=1&limit=100'
-✅ POST with path param: curl -X POST 'https://api.example.com/users/<<url.userId>>/items' -d '{"name": "item1", "type": "product"}'
-✅ DELETE with path param: curl -X DELETE 'https://api.example.com/items/<<url.itemId>>'
-
-WRONG EXAMPLES:
-❌ GET with body: curl -X GET 'https://api.example.com/items' -d '{"page": 1}' 
-❌ Templated query params: curl -X GET 'https://api.example.com/items?page=<<url.page>>'
-❌ Duplicate params: curl -X GET 'https://api.example.com/items?page=1&page=<<url.page>>'
-❌ Missing headers: curl -X GET 'https://api.example.com/items' (should include Content-Type, Accept, etc.)
-
-OUTPUT FORMAT (JSON):
-[
-  {
-    "name": "listOrganizationMembers",
-    "curl": "curl -X GET 'https://api.gitbook.com/v1/orgs/<<url.organizationId>>/members?page=1&limit=50&order=desc' -H 'Content-Type: application/json' -H 'Accept: application/json'"
-  },
-  {
-    "name": "updateOrganizationMember",
-    "curl": "curl -X PATCH 'https://api.gitbook.com/v1/orgs/<<url.organizationId>>/members/<<url.userId>>' -H 'Content-Type: application/json' -H 'Accept: application/json' -d '{\"role\": \"admin\"}'"
-  }
-]
-
-Return [] if no API endpoints found."""},
-                    {"role": "user", "content": f"Extract cURL commands from this page:\n\n{page_content}"}
-                ],
+                model=EXTRACTION_MODEL,
+                messages=messages,
                 temperature=0.1,
-                max_tokens=8000
-                
+                max_tokens=8000,
+                prompt_cache_key=EXTRACTION_PROMPT_CACHE_KEY
             )
             
             result_text = response.choices[0].message.content.strip()
-            
-            # DEBUG: Log AI response
-            logger.info(f"🤖 AI response for {page_url}: {result_text[:200]}...")
-            
-            # Parse JSON response from AI
-            try:
-                if '```json' in result_text:
-                    result_text = result_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in result_text:
-                    result_text = result_text.split('```')[1].split('```')[0].strip()
-                
-                curl_data = json.loads(result_text)
-                logger.info(f"✅ Successfully parsed {len(curl_data)} endpoints from {page_url}")
-                
-                # Add source page to each item
-                for item in curl_data:
-                    item['source_page'] = page_url
-                
-                return curl_data
-                
-            except json.JSONDecodeError as e:
-                logger.warning(f"⚠️ AI returned invalid JSON for {page_url}: {e}")
-                logger.warning(f"Raw response: {result_text}")
+            curl_data = self._parse_curl_response(result_text, page_url)
+            if curl_data is None:
                 return []
+            
+            # Only well-formed answers are cached - a bad response is retried next run. A bad
+            # cache file read as a miss above is overwritten here
+            if cache_path:
+                self._store_cached_curls(cache_path, curl_data)
+            return curl_data
         
         except Exception as e:
             logger.error(f"❌ AI extraction error for {page_url}: {str(e)}")
             return []
 
+
+# One keep-alive session for the token endpoint and connectorCreationHelper, so repeated
+# Fastn calls skip the TCP+TLS handshake. Connection failures and 502/503/504 are retried;
+# POSTs (connector creation isn't idempotent) only when the request never reached the server
+_FASTN_RETRY = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+_FASTN_SESSION = requests.Session()
+_FASTN_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_FASTN_RETRY))
+
+# Cached Fastn access token, reused until TOKEN_EXPIRY_MARGIN seconds before it expires.
+# The lock is held while a new token is requested, so concurrent callers wait for one
+# request instead of each minting their own
+_cached_token = {"value": None, "exp": 0.0}
+_token_lock = threading.Lock()
+TOKEN_EXPIRY_MARGIN = 30
+
+
 def generate_auth_token():
-    """Generate Fastn auth token"""
+    """Generate Fastn auth token, reusing the cached one while it is still valid"""
+    with _token_lock:
+        if _cached_token["value"] and _cached_token["exp"] - time.monotonic() > TOKEN_EXPIRY_MARGIN:
+            return _cached_token["value"]
+        
+        access_token, expires_in = _request_auth_token()
+        if access_token:
+            _cached_token["value"] = access_token
+            _cached_token["exp"] = time.monotonic() + expires_in
+        return access_token
+
+
+def _request_auth_token():
+    """Request a new Fastn auth token, returns (access_token, expires_in)"""
     logger.info("🔑 Generating Fastn auth token...")
     
     fastn_env = os.getenv("FASTN_ENV", "qa.fastn.ai")
@@ -1135,7 +1468,7 @@ def generate_auth_token():
     }
     
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = _FASTN_SESSION.post(url, headers=headers, data=data, timeout=30)
         response.raise_for_status()
         
         token_data = response.json()
@@ -1143,19 +1476,19 @@ def generate_auth_token():
         
         if access_token:
             logger.info("✅ Fastn auth token generated successfully")
-            return access_token
+            return access_token, token_data.get('expires_in', 300)
         else:
             logger.error("❌ No access token in response")
-            return None
+            return None, 0
             
     except Exception as e:
         logger.error(f"❌ Failed to generate Fastn auth token: {str(e)}")
-        return None
+        return None, 0
 
 
 def call_fastn_api(function_name: str, function_args: Dict) -> Dict:
     """Call Fastn API with logging"""
-    logger.info(f"🔧 Calling Fastn API: {function_name}")
+    logger.info("🔧 Calling Fastn API: %s", function_name)
     
     fastn_auth_token = generate_auth_token()
     if not fastn_auth_token:
@@ -1185,10 +1518,10 @@ def call_fastn_api(function_name: str, function_args: Dict) -> Dict:
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _FASTN_SESSION.post(url, headers=headers, json=payload, timeout=60)
         if response.status_code == 200:
             result = response.json()
-            logger.info(f"✅ Fastn API success: {function_name}")
+            logger.info("✅ Fastn API success: %s", function_name)
             return result
         else:
             error_msg = f"Fastn API error: {response.status_code} - {response.text}"
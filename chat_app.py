@@ -4,58 +4,355 @@ Clean Chat-based Connector Creation Agent
 Uses OpenAI function tools for clean interaction
 """
 
-import json
 import os
+import orjson
 import time
 import sys
+import queue
+import atexit
+import hashlib
+import threading
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
 import logging
 import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Import existing components
-from fastn_function import call_fastn_api, ORIGINAL_SYSTEM_PROMPT
+from fastn_function import call_fastn_api, rewrite_curl, disable_extraction_cache, ORIGINAL_SYSTEM_PROMPT
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Chat workflow instructions, prepended to the shared system prompt
+CHAT_WORKFLOW = """
+CHAT WORKFLOW:
+1. Ask user for platform name and documentation URL
+2. Use scrape_documentation tool to analyze the API  
+3. Based on scraping results, suggest authentication config
+4. Use create_connector_group tool when user approves
+5. Use create_connector_endpoint_under_group for each endpoint
+
+TOOL USAGE:
+- Always use tools to perform actions (no text commands)
+- After scraping, analyze the results and suggest appropriate auth
+- When creating endpoints, the connectorGroupId will be automatically used
+- Be conversational and helpful
+- Explain what you're doing at each step
+
+"""
+
+# Full system prompt - one interned string, sent as the first message of every request
+# and never stored in the conversation itself
+SYSTEM_PROMPT = sys.intern(CHAT_WORKFLOW + ORIGINAL_SYSTEM_PROMPT)
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Tool schema sent with every completion - built once at import
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "scrape_documentation",
+            "description": "Scrape API documentation to extract endpoints and auth info",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string"},
+                    "platform_name": {"type": "string"},
+                    "force_refresh": {
+                        "type": "boolean",
+                        "description": "Re-scrape even if this URL was scraped recently (use only if the cached result looks stale)"
+                    }
+                },
+                "required": ["url", "platform_name"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_connector_endpoint_under_group",
+            "description": "This function creates a connector endpoint using CURL commands. Curl Command Should be Valid should include required params headers , body. Verify it before calling this function.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "The name of the connector endpoint"
+                    },
+                    "curl": {
+                        "type": "string",
+                        "description": "The CURL command representing the connector's endpoint, with variables mapped as <<prefix.name>> (e.g. <<url.userId>>)"
+                    },
+                    "connectorGroupId": {
+                        "type": "string",
+                        "description": "The ID of the connector group to add the connector to"
+                    }
+                },
+                "required": ["name", "curl", "connectorGroupId"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_connector_group",
+            "description": "Creates a new connector group with a specified authentication type and auth details dont miss any required.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "The name for the new connector group."
+                    },
+                    "auth": {
+                        "type": "object",
+                        "description": "The authentication configuration for the group. The structure depends on the 'type' of authentication.",
+                        "properties": {
+                            "type": {
+                                "type": "string",
+                                "description": "The type of authentication.",
+                                "enum": ["oauth", "basic", "apiKey", "bearerToken", "customInput", "none"]
+                            },
+                            "details": {
+                                "type": "object",
+                                "description": "A JSON object containing the specific configuration for the chosen auth type. For 'oauth', this includes 'baseUrl', 'clientId', etc. For 'basic', 'apiKey', 'bearerToken', or 'customInput', it would be the specific fields required by the platform."
+                            }
+                        },
+                        "required": ["type", "details"]
+                    }
+                },
+                "required": ["name", "auth"]
+            }
+        }
+    }
+]
+
+# Parameter schemas by tool name, for checking arguments before a Fastn round trip
+TOOL_SCHEMAS = {tool["function"]["name"]: tool["function"]["parameters"] for tool in TOOLS}
+
+_JSON_TYPES = {"string": str, "object": dict, "array": list, "boolean": bool, "number": (int, float)}
+
+
+def schema_errors(schema: dict, value, path: str = "arguments") -> list:
+    """Check a value against the subset of JSON Schema our tools use (type, enum, required)"""
+    expected = _JSON_TYPES.get(schema.get("type"))
+    if expected and not isinstance(value, expected):
+        return [f"{path} must be of type {schema['type']}"]
+    if "enum" in schema and value not in schema["enum"]:
+        return [f"{path} must be one of {schema['enum']}"]
+    
+    errors = []
+    if isinstance(value, dict):
+        errors += [f"{path}.{key} is required" for key in schema.get("required", []) if key not in value]
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors += schema_errors(subschema, value[key], f"{path}.{key}")
+    return errors
+
+# Every chat request starts with the same system prompt and tool list - one cache key keeps
+# them routed to the same OpenAI prompt cache
+PROMPT_CACHE_KEY = "connector-agent-v1"
+
+# Session metadata (<session>.json) and message logs (<session>.ndjson)
+CONVERSATIONS_DIR = "conversations"
+
+# Most recent conversation messages sent with each request (the full history stays on disk)
+MAX_CONTEXT_MESSAGES = int(os.getenv("CHAT_CONTEXT_MESSAGES", "40"))
+
+# Dev/test replay cache: with AGENT_CACHE=1, a request whose exact messages were seen
+# before is answered from .agent_cache/ instead of calling the model
+RESPONSE_CACHE_ENABLED = os.getenv("AGENT_CACHE") == "1"
+RESPONSE_CACHE_DIR = ".agent_cache"
+
+
+def response_cache_path(messages: list, tool_choice: str) -> str:
+    """Cache file for a request - BLAKE2b of the exact messages (system prompt included)"""
+    os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+    key = hashlib.blake2b(orjson.dumps([tool_choice, messages]), digest_size=16).hexdigest()
+    return os.path.join(RESPONSE_CACHE_DIR, f"{key}.json")
+
+# Upper bound on tool calls (Fastn API requests, scrapes) run at once in a single turn
+MAX_TOOL_WORKERS = 8
+
+# Method / URL lookup for scraped cURL commands (single or double quoted URLs)
+CURL_METHOD_RE = re.compile(r"(?:-X|--request)\s+([A-Za-z]+)")
+CURL_URL_RE = re.compile(r"""['"](https?://[^'"]*)['"]""")
+
+# Fastn variables in endpoint curls: <<url.name>> or <<auth.name>>. Negated character
+# classes only, so matching stays linear even on hostile input
+CURL_VARIABLE_RE = re.compile(r"<<([^<>]*)>>")
+CURL_VARIABLE_NAME_RE = re.compile(r"(?:url|auth)\.[A-Za-z_][A-Za-z0-9_]*")
+
+
+def curl_variable_errors(curl: str) -> list:
+    """Problems with the <<prefix.name>> variables in a curl, checked before calling Fastn"""
+    errors = [
+        f"invalid variable <<{name}>> (expected <<url.name>> or <<auth.name>>)"
+        for name in CURL_VARIABLE_RE.findall(curl)
+        if not CURL_VARIABLE_NAME_RE.fullmatch(name)
+    ]
+    # Only the URL is checked for balance - bodies and headers may legitimately contain << or >>
+    match = CURL_URL_RE.search(curl)
+    if match and match.group(1).count("<<") != match.group(1).count(">>"):
+        errors.append("unbalanced << >> in curl URL")
+    return errors
+
+
+@lru_cache(maxsize=1)
+def get_openai_client():
+    """Shared OpenAI client so its connection pool is reused across sessions"""
+    from openai import OpenAI  # imported on first use - --list / --help never create a client
+    
+    # The SDK retries 429/5xx/connection errors with jittered exponential backoff
+    # (honouring Retry-After), so a transient rate limit doesn't kill the turn
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    )
+
+# Session files are written by one background thread, so saving never holds up the
+# prompt. A single writer also keeps appends to the same log in order.
+_write_queue = queue.Queue()
+_writer_started = False
+_writer_lock = threading.Lock()
+
+
+def _write_session_files():
+    while True:
+        path, data, append = _write_queue.get()
+        try:
+            if append:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+            else:
+                # Write-then-rename so a crash never leaves a half-written file
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to save conversation: {e}")
+        finally:
+            _write_queue.task_done()
+
+
+def queue_write(path: str, data: bytes, append: bool = False):
+    """Hand a session file write to the background writer"""
+    global _writer_started
+    with _writer_lock:
+        if not _writer_started:
+            threading.Thread(target=_write_session_files, name="session-writer", daemon=True).start()
+            _writer_started = True
+    _write_queue.put((path, data, append))
+
+
+def flush_writes():
+    """Block until every queued session write has reached disk"""
+    if _writer_started:
+        _write_queue.join()
+
+
+# The writer is a daemon thread - make sure pending writes land before the process exits
+atexit.register(flush_writes)
+
+
+class ToolCallDispatcher:
+    """Starts tool calls on a thread pool as soon as each one has finished streaming.
+    
+    Independent calls (Fastn API requests, scrapes) overlap with each other and with
+    the rest of the model's output. A create_connector_group call acts as a barrier:
+    calls after it wait for it, since they pick up the connector_group_id it sets.
+    Identical calls repeated in the same turn share the first call's result.
+    """
+    
+    def __init__(self, agent, executor):
+        self.agent = agent
+        self.executor = executor
+        self.futures = []
+        self.barrier = None
+        self.seen = {}  # (name, arguments) -> future
+    
+    def submit(self, tool_call: dict):
+        signature = (tool_call["function"]["name"], tool_call["function"]["arguments"])
+        if signature in self.seen:
+            self.futures.append(self.seen[signature])
+            return
+        
+        future = self.executor.submit(self.agent.run_tool_call, tool_call, self.barrier)
+        self.seen[signature] = future
+        if tool_call["function"]["name"] == "create_connector_group":
+            self.barrier = future
+        self.futures.append(future)
+    
+    def results(self) -> list:
+        """Tool results in the order the calls were streamed"""
+        return [future.result() for future in self.futures]
+
 class ChatConnectorAgent:
     def __init__(self, session_id=None):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_openai_client()
         self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         # Create conversations directory
-        self.conversations_dir = "conversations"
+        self.conversations_dir = CONVERSATIONS_DIR
         os.makedirs(self.conversations_dir, exist_ok=True)
         
+        # Session metadata lives in <session>.json, messages are appended to <session>.ndjson
         self.conversation_file = os.path.join(self.conversations_dir, f"{self.session_id}.json")
+        self.messages_file = os.path.join(self.conversations_dir, f"{self.session_id}.ndjson")
         
         # Session data
         self.platform_name = None
         self.connector_group_id = None
         self.scraped_endpoints = []
+        self.created_at = datetime.now().isoformat()
+        
+        # (connectorGroupId, endpoint name) created or being created this session, so the model
+        # re-sending an endpoint doesn't create a duplicate. Tool calls run concurrently, hence the lock
+        self.created_endpoints = set()
+        self._created_endpoints_lock = threading.Lock()
+        
+        # How many messages are already on disk, so each save only appends the new ones
+        self._persisted_len = 0
+        self._saved_meta = None
         
         # Load existing conversation or start new
         self.conversation = self.load_conversation()
+        self.created_endpoints.update(self.endpoints_created_in(self.conversation))
         
         logger.info(f"Started chat session: {self.session_id}")
     
     def save_conversation(self):
-        """Save conversation to local JSON file"""
+        """Queue new messages for the session's NDJSON log and update its metadata file"""
         try:
+            new_messages = self.conversation[self._persisted_len:]
+            if new_messages:
+                data = b"".join(orjson.dumps(message) + b"\n" for message in new_messages)
+                queue_write(self.messages_file, data, append=True)
+                self._persisted_len = len(self.conversation)
+            
             conversation_data = {
                 "session_id": self.session_id,
-                "created_at": datetime.now().isoformat(),
+                "created_at": self.created_at,
                 "platform_name": self.platform_name,
                 "connector_group_id": self.connector_group_id,
-                "conversation": self.conversation
+                "messages": len(self.conversation)
             }
             
-            with open(self.conversation_file, 'w', encoding='utf-8') as f:
-                json.dump(conversation_data, f, indent=2, ensure_ascii=False)
+            # Metadata is tiny, but skip the rewrite entirely when nothing changed
+            meta = orjson.dumps(conversation_data, option=orjson.OPT_INDENT_2)
+            if meta != self._saved_meta:
+                queue_write(self.conversation_file, meta)
+                self._saved_meta = meta
                 
         except Exception as e:
             logger.error(f"Failed to save conversation: {e}")
@@ -64,38 +361,79 @@ class ChatConnectorAgent:
         """Load existing conversation from file"""
         try:
             if os.path.exists(self.conversation_file):
-                with open(self.conversation_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.conversation_file, 'rb') as f:
+                    data = orjson.loads(f.read())
                     
                 # Restore session data
                 self.platform_name = data.get("platform_name")
                 self.connector_group_id = data.get("connector_group_id")
+                self.created_at = data.get("created_at", self.created_at)
                 
-                logger.info(f"Loaded existing conversation with {len(data.get('conversation', []))} messages")
-                return data.get("conversation", [])
+                if "conversation" in data:
+                    # Older sessions kept the whole conversation in the .json file. Leave
+                    # _persisted_len at 0 so the next save moves it all into the NDJSON log.
+                    # They also stored the system prompt inline - it is now added per request
+                    conversation = [m for m in data["conversation"] if m.get("role") != "system"]
+                elif os.path.exists(self.messages_file):
+                    with open(self.messages_file, 'rb') as f:
+                        conversation = [orjson.loads(line) for line in f if line.strip()]
+                    self._persisted_len = len(conversation)
+                else:
+                    conversation = []
+                
+                logger.info(f"Loaded existing conversation with {len(conversation)} messages")
+                return conversation
                 
         except Exception as e:
             logger.error(f"Failed to load conversation: {e}")
         
         return []
     
-    def list_previous_sessions(self):
-        """List all previous conversation sessions"""
+    def endpoints_created_in(self, conversation: list) -> set:
+        """(connectorGroupId, name) of every endpoint a resumed conversation already created"""
+        create_calls = {}
+        created = set()
+        for message in conversation:
+            for tool_call in message.get("tool_calls") or []:
+                if tool_call["function"]["name"] == "create_connector_endpoint_under_group":
+                    try:
+                        create_calls[tool_call["id"]] = orjson.loads(tool_call["function"]["arguments"])
+                    except orjson.JSONDecodeError:
+                        continue
+            
+            arguments = create_calls.get(message.get("tool_call_id")) if message.get("role") == "tool" else None
+            if not isinstance(arguments, dict) or not arguments.get("name"):
+                continue
+            try:
+                result = orjson.loads(message.get("content") or "")
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(result, dict) and "error" not in result:
+                # The group ID may have been filled in from the session rather than sent by the model
+                group_id = arguments.get("connectorGroupId") or self.connector_group_id
+                created.add((group_id, arguments["name"]))
+        return created
+    
+    @staticmethod
+    def list_previous_sessions(conversations_dir: str = CONVERSATIONS_DIR):
+        """List all previous conversation sessions (no agent or OpenAI client needed)"""
+        if not os.path.isdir(conversations_dir):
+            return []
         try:
             sessions = []
-            for filename in os.listdir(self.conversations_dir):
+            for filename in os.listdir(conversations_dir):
                 if filename.endswith('.json'):
                     session_id = filename[:-5]  # Remove .json
-                    filepath = os.path.join(self.conversations_dir, filename)
+                    filepath = os.path.join(conversations_dir, filename)
                     
                     try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
+                        with open(filepath, 'rb') as f:
+                            data = orjson.loads(f.read())
                             sessions.append({
                                 "session_id": session_id,
                                 "platform": data.get("platform_name", "Unknown"),
                                 "created_at": data.get("created_at", "Unknown"),
-                                "messages": len(data.get("conversation", []))
+                                "messages": data.get("messages", len(data.get("conversation", [])))
                             })
                     except:
                         continue
@@ -106,74 +444,6 @@ class ChatConnectorAgent:
             logger.error(f"Failed to list sessions: {e}")
             return []
     
-    def get_tools(self):
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "scrape_documentation",
-                    "description": "Scrape API documentation to extract endpoints and auth info",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "url": {"type": "string"},
-                            "platform_name": {"type": "string"}
-                        },
-                        "required": ["url", "platform_name"]
-                    }
-                }
-            },
-            {
-          "type": "function",
-          "function": {
-            "name": "create_connector_endpoint_under_group",
-            "description": "This function creates a connector endpoint using CURL commands. Curl Command Should be Valid should include required params headers , body. Verify it before calling this function.",
-            "parameters": {
-              "type": "object",
-              "properties": {
-                "name": { "type": "string", "description": "The name of the connector endpoint" },
-                "curl": { "type": "string", "description": "The CURL command representing the connector's endpoint.Curl Command SHould be Valid should include required params headers , body. Verify it before calling this function. And Make sure varaiables are mapped correctly with <<name.prefix>>" },
-                "connectorGroupId": { "type": "string", "description": "The ID of the connector group to add the connector to" }
-              },
-              "required": ["name", "curl", "connectorGroupId"]
-            }
-          }
-        },
-        {
-          "type": "function",
-          "function": {
-            "name": "create_connector_group",
-            "description": "Creates a new connector group with a specified authentication type and auth details dont miss any required.",
-            "parameters": {
-              "type": "object",
-              "properties": {
-                "name": {
-                  "type": "string",
-                  "description": "The name for the new connector group."
-                },
-                "auth": {
-                  "type": "object",
-                  "description": "The authentication configuration for the group. The structure depends on the 'type' of authentication.",
-                  "properties": {
-                    "type": {
-                      "type": "string",
-                      "description": "The type of authentication.",
-                      "enum": ["oauth", "basic", "apiKey", "bearerToken", "customInput", "none"]
-                    },
-                    "details": {
-                      "type": "object",
-                      "description": "A JSON object containing the specific configuration for the chosen auth type. For 'oauth', this includes 'baseUrl', 'clientId', etc. For 'basic', 'apiKey', 'bearerToken', or 'customInput', it would be the specific fields required by the platform."
-                    }
-                  },
-                  "required": ["type", "details"]
-                }
-              },
-              "required": ["name", "auth"]
-            }
-          }
-        }
-        ]
-    
     def execute_tool(self, tool_name: str, arguments: dict):
         """Execute tool and return clean result"""
         
@@ -188,7 +458,8 @@ class ChatConnectorAgent:
             params = {
                 'data': {
                     'input': {
-                        'pageUrl': url
+                        'pageUrl': url,
+                        'forceRefresh': bool(arguments.get("force_refresh", False))
                     }
                 }
             }
@@ -196,9 +467,9 @@ class ChatConnectorAgent:
             try:
                 # Call fastn_function
                 from fastn_function import fastn_function
-                start_time = time.time()
+                start_time = time.perf_counter()
                 
-                logger.info(f"🚀 Starting API extraction from URL: {url}")
+                logger.info("🚀 Starting API extraction from URL: %s", url)
                 result = fastn_function(params)
                 
                 # Format extracted endpoints
@@ -216,25 +487,30 @@ class ChatConnectorAgent:
                 
                 self.scraped_endpoints = extracted_endpoints
                 
-                # Calculate execution time
-                total_time = time.time() - start_time
+                # Calculate execution time (perf_counter - monotonic, unaffected by clock changes)
+                total_time = time.perf_counter() - start_time
+                scraping_time = float(result.get("executionTime", "0 seconds").split()[0])
                 
-                logger.info(f"✅ Found {len(extracted_endpoints)} endpoints in {total_time:.2f} seconds")
+                logger.info("✅ Found %d endpoints in %.2f seconds", len(extracted_endpoints), total_time)
                 
                 # Build result
                 api_result = {
                     "status": "success",
                     "pages_scraped": 1,
                     "endpoints_found": len(extracted_endpoints),
-                    "extracted_endpoints": extracted_endpoints,
+                    # method/url are only a parsed view of each curl - the model reads the
+                    # curl itself, so they're kept locally and not resent with every request
+                    "extracted_endpoints": [
+                        {"name": endpoint["name"], "curl": endpoint["curl"]} for endpoint in extracted_endpoints
+                    ],
                     "execution_time": {
                         "total_seconds": round(total_time, 2),
-                        "scraping_seconds": round(float(result.get("executionTime", "0 seconds").split()[0]), 2),
-                        "extraction_seconds": round(total_time - float(result.get("executionTime", "0 seconds").split()[0]), 2)
+                        "scraping_seconds": round(scraping_time, 2),
+                        "extraction_seconds": round(total_time - scraping_time, 2)
                     }
                 }
                 
-                return json.dumps(api_result)
+                return orjson.dumps(api_result).decode()
                 
             except Exception as e:
                 logger.error(f"❌ Error using fastn_function: {str(e)}")
@@ -244,68 +520,208 @@ class ChatConnectorAgent:
                     "endpoints_found": 0,
                     "extracted_endpoints": []
                 }
-                return json.dumps(error_result)
+                return orjson.dumps(error_result).decode()
             
         elif tool_name == "create_connector_group":
+            errors = schema_errors(TOOL_SCHEMAS[tool_name], arguments)
+            if errors:
+                return orjson.dumps({"error": f"Invalid arguments: {'; '.join(errors)}"}).decode()
+            
             result = call_fastn_api(tool_name, arguments)
             
             if "error" not in result:
                 self.connector_group_id = result.get("connectorGroupId") or result.get("id")
                 
-            return json.dumps(result)
+            return orjson.dumps(result).decode()
             
         elif tool_name == "create_connector_endpoint_under_group":
             # Use saved connector_group_id if not provided
             if not arguments.get("connectorGroupId") and self.connector_group_id:
                 arguments["connectorGroupId"] = self.connector_group_id
+            
+            # Map any {param} / :param placeholders the model left in the URL
+            if isinstance(arguments.get("curl"), str):
+                arguments["curl"] = rewrite_curl(arguments["curl"])
+            
+            errors = schema_errors(TOOL_SCHEMAS[tool_name], arguments)
+            if isinstance(arguments.get("curl"), str):
+                errors += curl_variable_errors(arguments["curl"])
+            if errors:
+                return orjson.dumps({"error": f"Invalid arguments: {'; '.join(errors)}"}).decode()
+            
+            endpoint_key = (arguments["connectorGroupId"], arguments["name"])
+            with self._created_endpoints_lock:
+                if endpoint_key in self.created_endpoints:
+                    return orjson.dumps({
+                        "error": f"Endpoint '{arguments['name']}' was already created in this connector group - not creating a duplicate"
+                    }).decode()
+                self.created_endpoints.add(endpoint_key)
                 
             result = call_fastn_api(tool_name, arguments)
-            return json.dumps(result)
+            if "error" in result:
+                # Failed creates can be retried
+                with self._created_endpoints_lock:
+                    self.created_endpoints.discard(endpoint_key)
+            return orjson.dumps(result).decode()
         
         else:
-            return json.dumps({"error": f"Unknown tool: {tool_name}"})
+            return orjson.dumps({"error": f"Unknown tool: {tool_name}"}).decode()
+    
+    def run_tool_call(self, tool_call: dict, wait_for=None) -> str:
+        """Execute a single streamed tool call, after the call it depends on (if any)"""
+        if wait_for is not None:
+            wait_for.result()
+        
+        tool_name = tool_call["function"]["name"]
+        arguments = orjson.loads(tool_call["function"]["arguments"])
+        
+        print(f"🔧 Executing: {tool_name}")
+        return self.execute_tool(tool_name, arguments)
     
     def _extract_method(self, curl: str) -> str:
-        if 'curl -X' in curl:
-            parts = curl.split(' ')
-            for i, part in enumerate(parts):
-                if part == '-X' and i + 1 < len(parts):
-                    return parts[i + 1]
-        return 'GET'
+        match = CURL_METHOD_RE.search(curl)
+        return match.group(1).upper() if match else 'GET'
     
     def _extract_url(self, curl: str) -> str:
-        match = re.search(r'"(https?://[^"]*)"', curl)
+        match = CURL_URL_RE.search(curl)
         return match.group(1) if match else "unknown"
     
+    def context_messages(self) -> list:
+        """System prompt plus a sliding window over the most recent messages.
+        
+        The window always starts at a user message, so an assistant tool call is
+        never sent without the tool results that answer it (or vice versa). When older
+        messages are cut, a short summary of the session state stands in for them.
+        """
+        window = self.conversation
+        if len(window) > MAX_CONTEXT_MESSAGES:
+            start = len(window) - MAX_CONTEXT_MESSAGES
+            user_turns = [i for i in range(start, len(window)) if window[i].get("role") == "user"]
+            if not user_turns:
+                # One turn is longer than the window - keep that whole turn
+                user_turns = [i for i in range(start) if window[i].get("role") == "user"][-1:] or [0]
+            if user_turns[0] > 0:
+                return [SYSTEM_MESSAGE, self.session_summary(user_turns[0]), *window[user_turns[0]:]]
+        return [SYSTEM_MESSAGE, *window]
+    
+    def session_summary(self, elided: int) -> dict:
+        """System message carrying what the elided messages established"""
+        parts = [f"SESSION SUMMARY: the {elided} earliest messages of this conversation are not shown."]
+        if self.platform_name:
+            parts.append(f"Platform: {self.platform_name}.")
+        if self.connector_group_id:
+            parts.append(f"Connector group ID: {self.connector_group_id}.")
+        with self._created_endpoints_lock:
+            created = sorted(name for _, name in self.created_endpoints)
+        if created:
+            parts.append(f"Endpoints already created (do not create them again): {', '.join(created)}.")
+        return {"role": "system", "content": " ".join(parts)}
+    
+    def stream_completion(self, tool_choice: str, on_tool_call=None):
+        """Stream a completion, printing text as it arrives. Returns (content, tool_calls)
+        
+        on_tool_call, if given, is called with each tool call as soon as its arguments
+        are complete - i.e. when the next call starts streaming, or the stream ends.
+        """
+        messages = self.context_messages()
+        
+        cache_path = None
+        if RESPONSE_CACHE_ENABLED:
+            cache_path = response_cache_path(messages, tool_choice)
+            cached = self.load_cached_completion(cache_path)
+            if cached is not None:
+                return self.replay_cached_completion(cache_path, *cached, on_tool_call=on_tool_call)
+        
+        stream = self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            tools=TOOLS,
+            tool_choice=tool_choice,
+            temperature=0.7,
+            max_tokens=5000,
+            prompt_cache_key=PROMPT_CACHE_KEY,
+            stream=True
+        )
+        
+        content_parts = []
+        tool_calls = {}  # Tool call fragments arrive keyed by index
+        
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            
+            if delta.content:
+                if not content_parts:
+                    print("\n🤖 ", end="", flush=True)
+                print(delta.content, end="", flush=True)
+                content_parts.append(delta.content)
+            
+            for tc in delta.tool_calls or []:
+                if on_tool_call and tool_calls and tc.index not in tool_calls:
+                    on_tool_call(tool_calls[max(tool_calls)])
+                call = tool_calls.setdefault(tc.index, {
+                    "id": None,
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function:
+                    call["function"]["name"] += tc.function.name or ""
+                    call["function"]["arguments"] += tc.function.arguments or ""
+        
+        if on_tool_call and tool_calls:
+            on_tool_call(tool_calls[max(tool_calls)])
+        
+        if content_parts:
+            print()
+        
+        content = "".join(content_parts) or None
+        tool_calls = [tool_calls[i] for i in sorted(tool_calls)]
+        
+        if cache_path:
+            queue_write(cache_path, orjson.dumps({"content": content, "tool_calls": tool_calls}))
+        
+        return content, tool_calls
+    
+    @staticmethod
+    def load_cached_completion(cache_path: str):
+        """Cached (content, tool_calls), or None on a miss - a corrupt or old-format file is
+        treated as missing, so the live response replaces it"""
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = orjson.loads(f.read())
+            content, tool_calls = cached["content"], cached["tool_calls"]
+        except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+            return None
+        if content is not None and not isinstance(content, str):
+            return None
+        if not isinstance(tool_calls, list) or not all(
+            isinstance(tool_call, dict) and isinstance(tool_call.get("function"), dict)
+            and {"name", "arguments"} <= tool_call["function"].keys()
+            for tool_call in tool_calls
+        ):
+            return None
+        return content, tool_calls
+    
+    def replay_cached_completion(self, cache_path: str, content, tool_calls: list, on_tool_call=None):
+        """Return a cached (content, tool_calls) as if it had just been streamed"""
+        logger.debug("Replaying cached response %s", cache_path)
+        if content:
+            print(f"\n🤖 {content}")
+        for tool_call in tool_calls:
+            if on_tool_call:
+                on_tool_call(tool_call)
+        
+        return content, tool_calls
+    
     def chat(self):
         print("🤖 " + "="*50)
         print("🤖 Fastn.ai Connector Creation Chat")
         print("🤖 Type 'quit' to exit")
         print("🤖 " + "="*50)
         
-        # Initial message with full system prompt
-        chat_workflow = """
-CHAT WORKFLOW:
-1. Ask user for platform name and documentation URL
-2. Use scrape_documentation tool to analyze the API  
-3. Based on scraping results, suggest authentication config
-4. Use create_connector_group tool when user approves
-5. Use create_connector_endpoint_under_group for each endpoint
-
-TOOL USAGE:
-- Always use tools to perform actions (no text commands)
-- After scraping, analyze the results and suggest appropriate auth
-- When creating endpoints, the connectorGroupId will be automatically used
-- Be conversational and helpful
-- Explain what you're doing at each step
-
-"""
-
-        self.conversation.append({
-            "role": "system", 
-            "content": chat_workflow + ORIGINAL_SYSTEM_PROMPT
-        })
-        
         print("\n🤖 Hi! I'll help you create Fastn.ai connectors.")
         print("🤖 What platform would you like to create a connector for?")
         
@@ -314,6 +730,7 @@ TOOL USAGE:
                 user_input = input("\n👤 You: ").strip()
                 
                 if user_input.lower() in ['quit', 'exit']:
+                    flush_writes()
                     print("🤖 Goodbye!")
                     break
                 
@@ -324,71 +741,44 @@ TOOL USAGE:
                 self.conversation.append({"role": "user", "content": user_input})
                 self.save_conversation()  # Save after user input
                 
-                # Get AI response with tools
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=self.conversation,
-                    tools=self.get_tools(),
-                    tool_choice="auto",
-                    temperature=0.7,
-                    max_tokens=5000
-                )
-                
-                message = response.choices[0].message
+                # Get AI response with tools (text is printed as it streams in, and
+                # each tool call starts running as soon as it has fully arrived)
+                with ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS) as executor:
+                    dispatcher = ToolCallDispatcher(self, executor)
+                    content, tool_calls = self.stream_completion(
+                        tool_choice="auto",
+                        on_tool_call=dispatcher.submit
+                    )
+                    results = dispatcher.results()
                 
                 # Handle tool calls
-                if message.tool_calls:
+                if tool_calls:
                     # Add assistant message with tool calls
                     self.conversation.append({
                         "role": "assistant",
-                        "content": message.content,
-                        "tool_calls": [
-                            {
-                                "id": tc.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments
-                                }
-                            } for tc in message.tool_calls
-                        ]
+                        "content": content,
+                        "tool_calls": tool_calls
                     })
                     
-                    # Execute tools and add results
-                    for tool_call in message.tool_calls:
-                        tool_name = tool_call.function.name
-                        arguments = json.loads(tool_call.function.arguments)
-                        
-                        print(f"🔧 Executing: {tool_name}")
-                        result = self.execute_tool(tool_name, arguments)
-                        
-                        # Add tool result to conversation
+                    # Add tool results (in the order the model asked for them)
+                    for tool_call, result in zip(tool_calls, results):
                         self.conversation.append({
                             "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_name,
+                            "tool_call_id": tool_call["id"],
+                            "name": tool_call["function"]["name"],
                             "content": result
                         })
                     
                     # Get AI's response to tool results
-                    followup_response = self.client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=self.conversation,
-                        tools=self.get_tools(),
-                        tool_choice="none",  # Force text response after tool execution
-                        temperature=0.7,
-                        max_tokens=5000
-                       
+                    followup_content, _ = self.stream_completion(
+                        tool_choice="none"  # Force text response after tool execution
                     )
                     
-                    followup_message = followup_response.choices[0].message
-                    
                     # Always expect content after tool execution
-                    if followup_message.content:
-                        print(f"\n🤖 {followup_message.content}")
+                    if followup_content:
                         self.conversation.append({
                             "role": "assistant",
-                            "content": followup_message.content
+                            "content": followup_content
                         })
                     else:
                         # Fallback if still null - force a response
@@ -402,15 +792,15 @@ TOOL USAGE:
                     self.save_conversation()  # Save after AI response
                     
                 else:
-                    # Regular text response
-                    print(f"\n🤖 {message.content}")
+                    # Regular text response (already printed while streaming)
                     self.conversation.append({
                         "role": "assistant", 
-                        "content": message.content
+                        "content": content
                     })
                     self.save_conversation()  # Save after AI response
                 
             except KeyboardInterrupt:
+                flush_writes()
                 print("\n🤖 Chat interrupted. Goodbye!")
                 break
             except Exception as e:
@@ -418,43 +808,45 @@ TOOL USAGE:
                 print(f"🤖 Sorry, I encountered an error: {e}")
 
 def main():
-    import sys
+    import argparse
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--list":
-            # List previous sessions
-            agent = ChatConnectorAgent()
-            sessions = agent.list_previous_sessions()
-            
-            if not sessions:
-                print("No previous conversation sessions found.")
-                return
-                
-            print("📋 Previous Conversation Sessions:")
-            print("=" * 50)
-            for i, session in enumerate(sessions[:10], 1):  # Show last 10
-                print(f"{i}. {session['session_id']}")
-                print(f"   Platform: {session['platform']}")
-                print(f"   Messages: {session['messages']}")
-                print(f"   Created: {session['created_at'][:19]}")
-                print()
-            
-            if len(sessions) > 10:
-                print(f"... and {len(sessions) - 10} more sessions")
-            
+    parser = argparse.ArgumentParser(description="Chat-based connector creation agent")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--list", action="store_true", help="list previous conversation sessions")
+    mode.add_argument("--resume", metavar="SESSION_ID", help="resume an existing session")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-scrape documentation instead of reusing extractions cached by earlier runs")
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        disable_extraction_cache()
+    
+    if args.list:
+        # List previous sessions - read straight from disk, without starting a session
+        sessions = ChatConnectorAgent.list_previous_sessions()
+        
+        if not sessions:
+            print("No previous conversation sessions found.")
             return
             
-        elif sys.argv[1] == "--resume":
-            if len(sys.argv) > 2:
-                session_id = sys.argv[2]
-                print(f"🔄 Resuming session: {session_id}")
-                agent = ChatConnectorAgent(session_id=session_id)
-            else:
-                print("Usage: python chat_app.py --resume <session_id>")
-                return
-        else:
-            print("Usage: python chat_app.py [--list | --resume <session_id>]")
-            return
+        # Built up front and written once rather than one print() per line
+        lines = ["📋 Previous Conversation Sessions:\n", "=" * 50, "\n"]
+        lines.extend(
+            f"{i}. {session['session_id']}\n"
+            f"   Platform: {session['platform']}\n"
+            f"   Messages: {session['messages']}\n"
+            f"   Created: {session['created_at'][:19]}\n\n"
+            for i, session in enumerate(sessions[:10], 1)  # Show last 10
+        )
+        if len(sessions) > 10:
+            lines.append(f"... and {len(sessions) - 10} more sessions\n")
+        
+        sys.stdout.write("".join(lines))
+        return
+        
+    elif args.resume:
+        print(f"🔄 Resuming session: {args.resume}")
+        agent = ChatConnectorAgent(session_id=args.resume)
     else:
         # Start new session
         agent = ChatConnectorAgent()
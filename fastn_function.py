@@ -1,20 +1,52 @@
 import os
-import json
+import re
+import hashlib
+import orjson
 import time
 import asyncio
 import logging
 import requests
+import threading
+import urllib.parse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List
+from collections import OrderedDict
+from functools import lru_cache
+from dotenv import load_dotenv
 from datetime import datetime
 from pydantic import BaseModel, Field, create_model
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, LLMConfig
-from crawl4ai import LLMExtractionStrategy
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_config() -> Dict:
+    """Load .env on first use and cache the settings this module reads.
+    
+    Loaded lazily (not at import) because callers like chat_app call load_dotenv()
+    after importing us. Call get_config.cache_clear() to pick up changed settings.
+    """
+    load_dotenv()
+    return {
+        "openai_api_key": os.getenv("OPENAI_API_KEY"),
+        "fastn_env": os.getenv("FASTN_ENV", "qa.fastn.ai"),
+        "fastn_username": os.getenv("FASTN_USERNAME"),
+        "fastn_password": os.getenv("FASTN_PASSWORD"),
+        "fastn_client_id": os.getenv("FASTN_CLIENT_ID", "fastn-app"),
+        "fastn_redirect_uri": os.getenv("FASTN_REDIRECT_URI", "https://google.com"),
+        "fastn_client_space_id": os.getenv("FASTN_CLIENT_SPACE_ID"),
+        "debug": os.getenv("AGENT_DEBUG") == "1"
+    }
+
+
+def debug_enabled() -> bool:
+    """Debug output (token usage tables, raw LLM dumps) is opt-in via AGENT_DEBUG=1"""
+    return get_config()["debug"]
+
+
 ORIGINAL_SYSTEM_PROMPT = """
 You are a Connector Creation Assistant for Fastn.ai. Your job is to help users create connectors by following a structured workflow.
 
@@ -395,26 +427,22 @@ Always make sure that every parameter accessed in the code (like `params['auth']
 """
 
 
-def fastn_function(params):
-    """Function to extract API endpoints and cURL commands from a URL using Crawl4AI LLM strategy"""
-    
-    # Create Pydantic models without classes using create_model
-    CurlCommand = create_model(
-        'CurlCommand',
-        name=(str, Field(description="Descriptive name for the API endpoint (e.g., 'listOrganizationMembers')")),
-        curl=(str, Field(description="Complete cURL command with proper syntax using single quotes"))
-    )
-    
-    CurlCommandList = create_model(
-        'CurlCommandList', 
-        commands=(List[CurlCommand], Field(description="List of extracted cURL commands"))
-    )
-    
-    async def extract_with_crawl4ai(url: str) -> Dict:
-        """Use Crawl4AI with LLM extraction strategy to get cURL commands"""
-        
-        # Concise system prompt with comprehensive mapping rules
-        extraction_instruction = """You are performing LLM-based scraping of API documentation. Be extremely thorough and comprehensive.
+# Create Pydantic models without classes using create_model
+CurlCommand = create_model(
+    'CurlCommand',
+    name=(str, Field(description="Descriptive name for the API endpoint (e.g., 'listOrganizationMembers')")),
+    curl=(str, Field(description="Complete cURL command with proper syntax using single quotes"))
+)
+
+CurlCommandList = create_model(
+    'CurlCommandList', 
+    commands=(List[CurlCommand], Field(description="List of extracted cURL commands"))
+)
+
+CURL_COMMAND_LIST_SCHEMA = CurlCommandList.model_json_schema()
+
+# Concise system prompt with comprehensive mapping rules
+EXTRACTION_INSTRUCTION = """You are performing LLM-based scraping of API documentation. Be extremely thorough and comprehensive.
 
 **SCRAPING INSTRUCTIONS:**
 - Read and understand ALL content fragments provided
@@ -472,101 +500,267 @@ Expected Output:
 
 Return [] if no endpoints found."""
 
-        # Configure LLM extraction strategy
-        llm_strategy = LLMExtractionStrategy(
-            llm_config=LLMConfig(
-                provider="openai/gpt-4.1-nano",  # Using gpt-4o-mini  or gpt-4.1-nano as requested
-                api_token=os.getenv("OPENAI_API_KEY")
-            ),
-            schema=CurlCommandList.model_json_schema(),
-            extraction_type="schema",
-            instruction=extraction_instruction,
-            chunk_token_threshold=9000,
-            overlap_rate=0.1,
-            apply_chunking=True,
-            input_format="markdown",  # Use markdown for better structure
-            extra_args={"temperature": 0.1, "max_tokens": 9000}
-        )
-
-        # Build crawler config
-        crawl_config = CrawlerRunConfig(
-            extraction_strategy=llm_strategy,
-            cache_mode=CacheMode.BYPASS
-        )
-
-        # Browser config
-        browser_config = BrowserConfig(headless=True)
-
-        try:
-            print(f"🌐 Starting Crawl4AI extraction from: {url}")
+# Deterministic placeholder mapping applied to every cURL the LLM produces, so the
+# documented {param} / :param forms end up as Fastn <<...>> variables even when the
+# model forgets to rewrite them
+_CURL_URL_RE = re.compile(r"""(['"])(https?://[^'"\s]+)\1""")
+# Single braces only - {{var}} is a template variable of some other tool, left untouched
+_BRACE_PARAM_RE = re.compile(r"(?<!\{)\{([A-Za-z_][A-Za-z0-9_]*)\}(?!\})")
+_COLON_PARAM_RE = re.compile(r"(?<=/):([A-Za-z_][A-Za-z0-9_]*)(?=/|$)")
+_UUID_SEGMENT_RE = re.compile(
+    r"/([A-Za-z][A-Za-z0-9_-]*)/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)"
+)
+_BASE_URL_PLACEHOLDERS = frozenset({"baseUrl", "domain", "host", "hostname", "instance", "server"})
+
+
+def _map_host_placeholder(match) -> str:
+    name = match.group(1)
+    return "<<auth.baseUrl>>" if name in _BASE_URL_PLACEHOLDERS else f"<<auth.{name}>>"
+
+
+def _map_uuid_segment(match) -> str:
+    resource = match.group(1)
+    if resource.endswith("ies"):
+        resource = resource[:-3] + "y"
+    elif resource.endswith("s") and not resource.endswith("ss"):
+        resource = resource[:-1]
+    return f"/{match.group(1)}/<<url.{resource}Id>>"
+
+
+def _rewrite_curl_url(match) -> str:
+    quote, url = match.groups()
+    scheme, _, rest = url.partition("://")
+    # urlsplit ends the host at the first '/', '?' or '#', so a query never counts as host
+    host = urllib.parse.urlsplit(url).netloc
+    path = rest[len(host):]
+    path_end = min((i for i in (path.find("?"), path.find("#")) if i >= 0), default=len(path))
+    path, suffix = path[:path_end], path[path_end:]
+    
+    # Query params, fragments and bodies stay static - only the host and path are mapped
+    host = _BRACE_PARAM_RE.sub(_map_host_placeholder, host)
+    path = _BRACE_PARAM_RE.sub(r"<<url.\1>>", path)
+    path = _COLON_PARAM_RE.sub(r"<<url.\1>>", path)
+    path = _UUID_SEGMENT_RE.sub(_map_uuid_segment, path)
+    
+    return f"{quote}{scheme}://{host}{path}{suffix}{quote}"
+
+
+def rewrite_curl(curl: str) -> str:
+    """Map {param}, :param and UUID path segments in a cURL URL to <<url.*>>/<<auth.*>> variables"""
+    if not curl:
+        return curl
+    return _CURL_URL_RE.sub(_rewrite_curl_url, curl, count=1)
+
+
+@lru_cache(maxsize=1)
+def get_browser_config():
+    """Browser config, built on first scrape - crawl4ai (and its browser stack) is only
+    imported when a page is actually crawled, so importing this module stays cheap"""
+    from crawl4ai import BrowserConfig
+    return BrowserConfig(headless=True)
+
+
+async def extract_with_crawl4ai(url: str) -> Dict:
+    """Use Crawl4AI with LLM extraction strategy to get cURL commands"""
+    from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode, LLMConfig, LLMExtractionStrategy
+
+    # Configure LLM extraction strategy
+    llm_strategy = LLMExtractionStrategy(
+        llm_config=LLMConfig(
+            provider="openai/gpt-4.1-nano",  # Using gpt-4o-mini  or gpt-4.1-nano as requested
+            api_token=get_config()["openai_api_key"]
+        ),
+        schema=CURL_COMMAND_LIST_SCHEMA,
+        extraction_type="schema",
+        instruction=EXTRACTION_INSTRUCTION,
+        chunk_token_threshold=9000,
+        overlap_rate=0.1,
+        apply_chunking=True,
+        input_format="markdown",  # Use markdown for better structure
+        extra_args={"temperature": 0.1, "max_tokens": 9000}
+    )
+
+    # Build crawler config
+    crawl_config = CrawlerRunConfig(
+        extraction_strategy=llm_strategy,
+        cache_mode=CacheMode.BYPASS
+    )
+
+    try:
+        print(f"🌐 Starting Crawl4AI extraction from: {url}")
+        
+        async with AsyncWebCrawler(config=get_browser_config()) as crawler:
+            result = await crawler.arun(url=url, config=crawl_config)
             
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                result = await crawler.arun(url=url, config=crawl_config)
+            if result.success:
+                print("✅ Crawl4AI extraction successful")
                 
-                if result.success:
-                    print("✅ Crawl4AI extraction successful")
+                # Parse the extracted content
+                try:
+                    extracted_data = orjson.loads(result.extracted_content)
+                    
+                    # Handle both list and dict structures
+                    if isinstance(extracted_data, list):
+                        commands = extracted_data
+                    elif isinstance(extracted_data, dict):
+                        commands = extracted_data.get('commands', [])
+                    else:
+                        print(f"⚠️ Unexpected data structure: {type(extracted_data)}")
+                        commands = []
+                    
+                    for command in commands:
+                        if isinstance(command, dict) and isinstance(command.get('curl'), str):
+                            command['curl'] = rewrite_curl(command['curl'])
                     
-                    # Parse the extracted content
-                    try:
-                        extracted_data = json.loads(result.extracted_content)
-                        
-                        # Handle both list and dict structures
-                        if isinstance(extracted_data, list):
-                            commands = extracted_data
-                        elif isinstance(extracted_data, dict):
-                            commands = extracted_data.get('commands', [])
-                        else:
-                            print(f"⚠️ Unexpected data structure: {type(extracted_data)}")
-                            commands = []
-                        
-                        # Commands are ready to use as-is
-                        
-                        print(f"🔗 Found {len(commands)} cURL commands")
+                    print(f"🔗 Found {len(commands)} cURL commands")
+                    if debug_enabled():
                         llm_strategy.show_usage()  # Show token usage
-                        
-                        return {
-                            "status": "success", 
-                            "curl_commands": commands,
-                            "count": len(commands)
-                        }
-                        
-                    except json.JSONDecodeError as e:
-                        print(f"⚠️ JSON parse error: {e}")
+                    
+                    return {
+                        "status": "success", 
+                        "curl_commands": commands,
+                        "count": len(commands)
+                    }
+                    
+                except orjson.JSONDecodeError as e:
+                    print(f"⚠️ JSON parse error: {e}")
+                    if debug_enabled():
                         print(f"Raw extracted content: {result.extracted_content[:500]}...")
-                        return {
-                            "status": "failed",
-                            "error": f"Failed to parse extracted JSON: {str(e)}",
-                            "curl_commands": [],
-                            "count": 0
-                        }
-                else:
-                    print(f"❌ Crawl4AI failed: {result.error_message}")
-            return {
-                "status": "failed",
-                        "error": f"Crawl4AI extraction failed: {result.error_message}",
-                "curl_commands": [],
+                    return {
+                        "status": "failed",
+                        "error": f"Failed to parse extracted JSON: {str(e)}",
+                        "curl_commands": [],
                         "count": 0
                     }
-                    
-        except Exception as e:
-            print(f"💥 Exception in Crawl4AI: {str(e)}")
-            return {
-                "status": "failed",
-                "error": f"Exception during extraction: {str(e)}",
-                "curl_commands": [],
-                "count": 0
-            }
+            else:
+                print(f"❌ Crawl4AI failed: {result.error_message}")
+        return {
+            "status": "failed",
+            "error": f"Crawl4AI extraction failed: {result.error_message}",
+            "curl_commands": [],
+            "count": 0
+        }
+                
+    except Exception as e:
+        print(f"💥 Exception in Crawl4AI: {str(e)}")
+        return {
+            "status": "failed",
+            "error": f"Exception during extraction: {str(e)}",
+            "curl_commands": [],
+            "count": 0
+        }
+
+
+# Successful extractions keyed by normalized URL, so re-scraping the same docs page
+# (retries, repeated questions, later sessions) doesn't pay for the crawl + LLM again.
+# Kept in memory and mirrored to _EXTRACTION_CACHE_DIR so the cache survives restarts;
+# disable_extraction_cache() (chat_app --no-cache) turns both off
+_EXTRACTION_CACHE_TTL = 24 * 60 * 60
+_EXTRACTION_CACHE_SIZE = 256
+_EXTRACTION_CACHE_DIR = os.path.join(".agent_cache", "extractions")
+_extraction_cache = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+_extraction_cache_enabled = True
+
+
+def disable_extraction_cache():
+    """Always crawl and extract afresh for the rest of the process"""
+    global _extraction_cache_enabled
+    _extraction_cache_enabled = False
+
+
+def _cache_key(url: str) -> str:
+    # Only scheme and host are case-insensitive; paths and queries are not
+    parts = urllib.parse.urlsplit(url.strip().rstrip('/'))
+    return urllib.parse.urlunsplit(parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()))
+
+
+def _cache_file(key: str) -> str:
+    return os.path.join(_EXTRACTION_CACHE_DIR, f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json")
+
+
+def _get_cached_extraction(url: str):
+    if not _extraction_cache_enabled:
+        return None
+    key = _cache_key(url)
+    with _extraction_cache_lock:
+        entry = _extraction_cache.get(key)
+        if entry is None:
+            entry = _load_extraction_file(key)
+            if entry is None:
+                return None
+            _extraction_cache[key] = entry
+        stored_at, result = entry
+        if time.monotonic() - stored_at > _EXTRACTION_CACHE_TTL:
+            del _extraction_cache[key]
+            return None
+        _extraction_cache.move_to_end(key)
+        while len(_extraction_cache) > _EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+        return dict(result)
+
 
+def _load_extraction_file(key: str):
+    """(monotonic stored_at, result) from a previous process's cache file, or None"""
+    try:
+        with open(_cache_file(key), 'rb') as f:
+            data = orjson.loads(f.read())
+        # Stored with wall-clock time; convert so the TTL check above works unchanged
+        return time.monotonic() - (time.time() - data["stored_at"]), data["result"]
+    except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+        # Unreadable or not in the expected shape - treat as a miss
+        return None
+
+
+def _store_extraction(url: str, result: Dict):
+    # Failures are not cached so the next call retries them
+    if not _extraction_cache_enabled or result.get("status") != "success":
+        return
+    key = _cache_key(url)
+    with _extraction_cache_lock:
+        _extraction_cache[key] = (time.monotonic(), dict(result))
+        _extraction_cache.move_to_end(key)
+        while len(_extraction_cache) > _EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+    try:
+        os.makedirs(_EXTRACTION_CACHE_DIR, exist_ok=True)
+        with open(_cache_file(key), 'wb') as f:
+            f.write(orjson.dumps({"stored_at": time.time(), "result": result}))
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write extraction cache: {e}")
+
+
+async def fastn_function_async(params):
+    """Async variant of fastn_function so several extractions can share one event loop"""
+    
     # Main function logic
     pageUrl = params['data']['input']['pageUrl']
-    start_time = time.time()
+    force_refresh = params['data']['input'].get('forceRefresh', False)
+    start_time = time.perf_counter()
+    
+    cached = None if force_refresh else _get_cached_extraction(pageUrl)
+    if cached is not None:
+        logger.info("♻️ Using cached extraction for %s", pageUrl)
+        cached["cached"] = True
+        cached["executionTime"] = f"{time.perf_counter() - start_time:.2f} seconds"
+        return cached
     
+    result = await extract_with_crawl4ai(pageUrl)
+    _store_extraction(pageUrl, result)
+    
+    # Calculate execution time and add to result
+    duration = time.perf_counter() - start_time
+    result["executionTime"] = f"{duration:.2f} seconds"
+    
+    # Return results
+    return result
+
+
+def fastn_function(params):
+    """Function to extract API endpoints and cURL commands from a URL using Crawl4AI LLM strategy"""
     try:
         # Run the async extraction
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(extract_with_crawl4ai(pageUrl))
-        loop.close()
+        return asyncio.run(fastn_function_async(params))
             
     except Exception as e:
         return {
@@ -576,13 +770,6 @@ Return [] if no endpoints found."""
             "count": 0,
             "executionTime": "0 seconds"
         }
-    
-    # Calculate execution time and add to result
-    duration = time.time() - start_time
-    result["executionTime"] = f"{duration:.2f} seconds"
-    
-    # Return results
-    return result
 
 def main():
     """Test the fastn_function with GitBook API documentation"""
@@ -631,11 +818,61 @@ def main():
 
 
 
+# One pooled session for every Fastn call (auth + connectorCreationHelper) so both
+# reuse the same keep-alive connections to the Fastn host. Connection failures and
+# 502/503/504 are retried; POSTs (connector creation isn't idempotent) are only
+# retried when the request never reached the server
+_FASTN_RETRY = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+_FASTN_SESSION = requests.Session()
+_FASTN_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_FASTN_RETRY))
+
+# Cached Fastn access token. Fresh until TOKEN_REFRESH_AHEAD seconds before expiry;
+# after that it is still served while a background thread mints the next one, and
+# only within TOKEN_EXPIRY_MARGIN of expiry does a caller block on a new token
+_cached_token = {"value": None, "exp": 0.0, "refreshing": False}
+_token_lock = threading.Lock()
+TOKEN_REFRESH_AHEAD = 180
+TOKEN_EXPIRY_MARGIN = 30
+
+
+def _store_token(access_token, expires_in):
+    if access_token:
+        _cached_token["value"] = access_token
+        _cached_token["exp"] = time.monotonic() + expires_in
+
+
+def _refresh_token_in_background():
+    try:
+        access_token, expires_in = _request_auth_token()
+        with _token_lock:
+            _store_token(access_token, expires_in)
+    finally:
+        _cached_token["refreshing"] = False
+
+
 def generate_auth_token():
-    """Generate Fastn auth token"""
+    """Generate Fastn auth token, reusing the cached one while it is still valid"""
+    with _token_lock:
+        remaining = _cached_token["exp"] - time.monotonic()
+        
+        if _cached_token["value"] and remaining > TOKEN_EXPIRY_MARGIN:
+            # Stale: hand out the current token and refresh it off the request path
+            if remaining <= TOKEN_REFRESH_AHEAD and not _cached_token["refreshing"]:
+                _cached_token["refreshing"] = True
+                threading.Thread(target=_refresh_token_in_background, daemon=True).start()
+            return _cached_token["value"]
+        
+        access_token, expires_in = _request_auth_token()
+        _store_token(access_token, expires_in)
+        return access_token
+
+
+def _request_auth_token():
+    """Request a new Fastn auth token, returns (access_token, expires_in)"""
     logger.info("🔑 Generating Fastn auth token...")
     
-    fastn_env = os.getenv("FASTN_ENV", "qa.fastn.ai")
+    config = get_config()
+    fastn_env = config["fastn_env"]
     url = f'https://{fastn_env}/auth/realms/fastn/protocol/openid-connect/token'
     headers = {
         'realm': 'fastn',
@@ -644,42 +881,36 @@ def generate_auth_token():
     
     data = {
         'grant_type': 'password',
-        'username': os.getenv("FASTN_USERNAME"),
-        'password': os.getenv("FASTN_PASSWORD"),
-        'client_id': os.getenv("FASTN_CLIENT_ID", "fastn-app"),
-        'redirect_uri': os.getenv("FASTN_REDIRECT_URI", "https://google.com"),
+        'username': config["fastn_username"],
+        'password': config["fastn_password"],
+        'client_id': config["fastn_client_id"],
+        'redirect_uri': config["fastn_redirect_uri"],
         'scope': 'openid'
     }
     
     try:
-        response = requests.post(url, headers=headers, data=data)
+        response = _FASTN_SESSION.post(url, headers=headers, data=data, timeout=30)
         response.raise_for_status()
         
-        token_data = response.json()
+        token_data = orjson.loads(response.content)
         access_token = token_data.get('access_token')
         
         if access_token:
             logger.info("✅ Fastn auth token generated successfully")
-            return access_token
+            return access_token, token_data.get('expires_in', 300)
         else:
             logger.error("❌ No access token in response")
-            return None
+            return None, 0
             
     except Exception as e:
         logger.error(f"❌ Failed to generate Fastn auth token: {str(e)}")
-        return None
+        return None, 0
 
 
-def call_fastn_api(function_name: str, function_args: Dict) -> Dict:
-    """Call Fastn API with logging"""
-    logger.info(f"🔧 Calling Fastn API: {function_name}")
-    
-    fastn_auth_token = generate_auth_token()
-    if not fastn_auth_token:
-        return {"error": "Failed to generate Fastn auth token"}
-    
-    env = os.getenv("FASTN_ENV", "qa.fastn.ai")
-    client_id = os.getenv("FASTN_CLIENT_SPACE_ID")
+@lru_cache(maxsize=1)
+def _fastn_request_template():
+    """connectorCreationHelper URL and the headers shared by every call (all but the token)"""
+    env = get_config()["fastn_env"]
     client_id_ = "b034812a-7d77-4e8e-945e-106656b2676e"
     url = f"https://{env}/api/v1/connectorCreationHelper"
     
@@ -688,24 +919,37 @@ def call_fastn_api(function_name: str, function_args: Dict) -> Dict:
         "x-fastn-space-id": client_id_,
         "x-fastn-space-tenantid": "",
         "stage": "DRAFT",
-        "x-fastn-custom-auth": "true",
-        "authorization": fastn_auth_token
+        "x-fastn-custom-auth": "true"
     }
+    return url, headers
+
+
+def call_fastn_api(function_name: str, function_args: Dict) -> Dict:
+    """Call Fastn API with logging"""
+    logger.info("🔧 Calling Fastn API: %s", function_name)
+    
+    fastn_auth_token = generate_auth_token()
+    if not fastn_auth_token:
+        return {"error": "Failed to generate Fastn auth token"}
+    
+    config = get_config()
+    url, base_headers = _fastn_request_template()
+    headers = {**base_headers, "authorization": fastn_auth_token}
     
     payload = {
         "input": {
-            "env": env,
-            "clientId": client_id,
+            "env": config["fastn_env"],
+            "clientId": config["fastn_client_space_id"],
             "function": function_name,
             "arguments": function_args
         }
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = _FASTN_SESSION.post(url, headers=headers, json=payload, timeout=60)
         if response.status_code == 200:
-            result = response.json()
-            logger.info(f"✅ Fastn API success: {function_name}")
+            result = orjson.loads(response.content)
+            logger.info("✅ Fastn API success: %s", function_name)
             return result
         else:
             error_msg = f"Fastn API error: {response.status_code} - {response.text}"
@@ -0,0 +1,55 @@
+import unittest
+
+from app import UniversalWebScraper, endpoint_fingerprint
+
+
+class EndpointFingerprintTest(unittest.TestCase):
+    def test_path_placeholder_styles_collapse(self):
+        fingerprints = {
+            endpoint_fingerprint("curl -X GET 'https://api.x.com/v1/users/<<url.userId>>'"),
+            endpoint_fingerprint("curl -X GET 'https://api.x.com/v1/users/{id}'"),
+            endpoint_fingerprint("curl -X GET 'https://api.x.com/v1/users/:id/'"),
+        }
+        self.assertEqual(fingerprints, {"GET api.x.com/v1/users/{param}?"})
+
+    def test_graphql_bodies_are_distinct(self):
+        query = endpoint_fingerprint(
+            """curl -X POST 'https://api.x.com/graphql' -d '{"query": "{ viewer { id } }"}'"""
+        )
+        mutation = endpoint_fingerprint(
+            """curl -X POST 'https://api.x.com/graphql' -d '{"query": "mutation { addStar { id } }"}'"""
+        )
+        self.assertNotEqual(query, mutation)
+
+    def test_json_body_key_order_ignored(self):
+        self.assertEqual(
+            endpoint_fingerprint("""curl 'https://api.x.com/rpc' -d '{"method": "a", "id": 1}'"""),
+            endpoint_fingerprint("""curl 'https://api.x.com/rpc' -d '{"id": 1,  "method": "a"}'"""),
+        )
+
+    def test_action_style_query_values_are_distinct(self):
+        describe = endpoint_fingerprint("curl 'https://ec2.amazonaws.com/?Action=DescribeInstances'")
+        run = endpoint_fingerprint("curl 'https://ec2.amazonaws.com/?Action=RunInstances'")
+        self.assertNotEqual(describe, run)
+        self.assertEqual(describe, "GET ec2.amazonaws.com?Action=DescribeInstances")
+
+    def test_templated_query_values_dropped(self):
+        self.assertEqual(
+            endpoint_fingerprint("curl 'https://api.x.com/items?page=<<url.page>>&q={q}'"),
+            "GET api.x.com/items?page&q",
+        )
+
+    def test_new_endpoints_keeps_distinct_operations(self):
+        seen = set()
+        page_curls = [
+            {"name": "viewer", "curl": """curl -X POST 'https://api.x.com/graphql' -d '{"query": "{ viewer { id } }"}'"""},
+            {"name": "addStar", "curl": """curl -X POST 'https://api.x.com/graphql' -d '{"query": "mutation { addStar { id } }"}'"""},
+            {"name": "getUser", "curl": "curl 'https://api.x.com/v1/users/{id}'"},
+            {"name": "getUserAgain", "curl": "curl 'https://api.x.com/v1/users/<<url.userId>>'"},
+        ]
+        new_endpoints = UniversalWebScraper._new_endpoints(page_curls, seen)
+        self.assertEqual([item["name"] for item in new_endpoints], ["viewer", "addStar", "getUser"])
+
+
+if __name__ == "__main__":
+    unittest.main()
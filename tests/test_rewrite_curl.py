@@ -0,0 +1,57 @@
+import unittest
+
+from fastn_function import rewrite_curl
+
+
+class RewriteCurlTest(unittest.TestCase):
+    def test_path_and_host_placeholders(self):
+        self.assertEqual(
+            rewrite_curl("curl 'https://{domain}/v1/users/{userId}/posts/:postId'"),
+            "curl 'https://<<auth.baseUrl>>/v1/users/<<url.userId>>/posts/<<url.postId>>'"
+        )
+
+    def test_double_braces_left_alone(self):
+        self.assertEqual(
+            rewrite_curl("curl 'https://{{host}}/v1/{id}'"),
+            "curl 'https://{{host}}/v1/<<url.id>>'"
+        )
+        self.assertEqual(
+            rewrite_curl("curl 'https://api.x.com/v1/{{itemId}}'"),
+            "curl 'https://api.x.com/v1/{{itemId}}'"
+        )
+
+    def test_query_without_path_stays_static(self):
+        self.assertEqual(
+            rewrite_curl("curl 'https://{domain}.x.com?x={y}'"),
+            "curl 'https://<<auth.baseUrl>>.x.com?x={y}'"
+        )
+
+    def test_query_and_fragment_stay_static(self):
+        self.assertEqual(
+            rewrite_curl('curl "https://api.x.com/v1/users/{id}?fields={fields}#{frag}"'),
+            'curl "https://api.x.com/v1/users/<<url.id>>?fields={fields}#{frag}"'
+        )
+
+    def test_uuid_segment_names(self):
+        uuid = "123e4567-e89b-12d3-a456-426614174000"
+        self.assertEqual(
+            rewrite_curl(f"curl 'https://api.x.com/categories/{uuid}'"),
+            "curl 'https://api.x.com/categories/<<url.categoryId>>'"
+        )
+        self.assertEqual(
+            rewrite_curl(f"curl 'https://api.x.com/users/{uuid}/items'"),
+            "curl 'https://api.x.com/users/<<url.userId>>/items'"
+        )
+        self.assertEqual(
+            rewrite_curl(f"curl 'https://api.x.com/address/{uuid}'"),
+            "curl 'https://api.x.com/address/<<url.addressId>>'"
+        )
+
+    def test_body_and_empty_input_untouched(self):
+        curl = "curl -X POST 'https://api.x.com/v1/items' -d '{\"name\": \"{name}\"}'"
+        self.assertEqual(rewrite_curl(curl), curl)
+        self.assertEqual(rewrite_curl(""), "")
+
+
+if __name__ == "__main__":
+    unittest.main()